@@ -0,0 +1,63 @@
+"""
+Бенчмарк памяти: сколько байт занимает один студент.
+Сравнивает прежнее представление (объект с __dict__ и List[int]),
+текущий Student (__slots__ + array('B')) и колоночную StudentTable.
+
+Запуск из каталога lab_2:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --sizes 1000 100000 10000000
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, List
+
+from lab.models import Student, StudentTable
+from benchmarks.synthetic import iter_roster
+
+DEFAULT_SIZES = [1_000, 100_000]
+
+
+class LegacyStudent:
+    """Прежнее представление студента: обычный класс с __dict__ и списком оценок."""
+
+    def __init__(self, student_id: int, name: str, grades: List[int]):
+        self._id = student_id
+        self._name = name
+        self._grades = grades
+
+
+def measure(build: Callable[[int], object], count: int) -> float:
+    """Возвращает число байт на студента для структуры, построенной build."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        data = build(count)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del data
+    return current / count
+
+
+LAYOUTS = {
+    "legacy (__dict__ + list)": lambda n: [LegacyStudent(*row) for row in iter_roster(n)],
+    "Student (__slots__ + array)": lambda n: [Student(*row) for row in iter_roster(n)],
+    "StudentTable (columns)": lambda n: StudentTable.from_students(
+        Student.from_trusted(*row) for row in iter_roster(n)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Память на одного студента")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(f"{'Представление':<30} " + " ".join(f"{n:>12,}" for n in args.sizes))
+    for title, build in LAYOUTS.items():
+        cells = [f"{measure(build, n):>10.1f} B" for n in args.sizes]
+        print(f"{title:<30} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
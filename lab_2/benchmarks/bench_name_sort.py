@@ -0,0 +1,42 @@
+"""
+Бенчмарк сортировки по имени: прежняя сортировка по строке (lambda s: s.name)
+против стратегии 'collate' с кэшированными ключами сопоставления.
+Для 'collate' замеряются первый вызов (ключи вычисляются) и повторный
+(ключи берутся из Student).
+
+Запуск из каталога lab_2:
+    python -m benchmarks.bench_name_sort
+    python -m benchmarks.bench_name_sort --size 100000
+"""
+import argparse
+import time
+from typing import Callable
+
+from lab.models import Student
+from lab.processing import sort_students
+from benchmarks.synthetic import iter_roster
+
+def make_students(count: int, seed: int = 42):
+    return [Student.from_trusted(i, name, []) for i, name, _ in iter_roster(count, seed, max_grades=0)]
+
+
+def timed(action: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сортировка имен: lambda против collate")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    students = make_students(args.size)
+    print(f"Студентов: {args.size:,}")
+    print(f"name (lambda s: s.name):     {timed(lambda: sort_students(students, 'name')):8.3f} с")
+    print(f"collate, первый вызов:       {timed(lambda: sort_students(students, 'collate')):8.3f} с")
+    print(f"collate, ключи в кэше:       {timed(lambda: sort_students(students, 'collate')):8.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Воспроизводимый набор бенчмарков для lab_2.
+Замеряет время загрузки, сохранения, экспорта ТОП-N, статистики,
+сортировки и выборки ТОП-N на синтетических списках заданных размеров.
+Каждый замер выполняется в отдельном процессе, поэтому пиковый RSS
+(ru_maxrss) относится только к этому замеру (включая подготовку данных).
+При --trace-alloc дополнительно считается пик выделенной памяти
+через tracemalloc (замедляет выполнение, время при этом не сравнивается).
+
+Запуск из каталога lab_2:
+    python -m benchmarks.run --sizes 1000 100000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --sizes 1000 100000 --baseline benchmarks/baseline.json
+
+При сравнении с базой код возврата 1 означает регрессию времени
+больше допустимой (--tolerance, по умолчанию 20%).
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import lab.io_utils as io
+import lab.processing as proc
+from lab.journal import load_with_journal
+from benchmarks.synthetic import write_roster_csv
+
+DEFAULT_SIZES = [1_000, 100_000]
+DEFAULT_SEED = 42
+TOP_N = 100
+
+
+def _load(path: str):
+    return io.load_students_from_csv(path, validate='fast')
+
+
+def _snapshot(path: str) -> str:
+    """Сохраняет ростер рядом в бинарный снимок и возвращает его путь."""
+    snap = path + io.SNAPSHOT_SUFFIX
+    io.save_snapshot(snap, _load(path))
+    return snap
+
+
+# Каждая операция: (подготовка по пути к файлу, замеряемое действие)
+OPERATIONS: Dict[str, Callable] = {
+    "load_students_from_csv": lambda path: (None, lambda _: io.load_students_from_csv(path)),
+    "save_students_to_csv": lambda path: (_load(path), lambda students: io.save_students_to_csv(
+        path + ".out.csv", students)),
+    "export_top_students_to_csv": lambda path: (_load(path), lambda students: io.export_top_students_to_csv(
+        path + ".top.csv", proc.get_top_n_students(students, TOP_N))),
+    "calculate_group_stats": lambda path: (_load(path), proc.calculate_group_stats),
+    "sort_students": lambda path: (_load(path), lambda students: proc.sort_students(students, 'avg')),
+    "get_top_n_students": lambda path: (_load(path), lambda students: proc.get_top_n_students(students, TOP_N)),
+    # Снимок без материализации (пакетный интерфейс) и путь пункта 1 меню:
+    # Student на каждую строку и хранилище, линейно по числу студентов
+    "load_snapshot_lazy": lambda path: (_snapshot(path), lambda snap: io.load_snapshot(snap, lazy=True)),
+    "load_snapshot_menu": lambda path: (_snapshot(path), load_with_journal),
+}
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS — байты
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(operation: str, path: str, repeat: int, trace_alloc: bool) -> dict:
+    """Выполняет один замер. Запускается в отдельном процессе."""
+    # Сообщения загрузчика о заголовках не нужны в выводе бенчмарка
+    sys.stdout = open(os.devnull, "w")
+
+    data, action = OPERATIONS[operation](path)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action(data)
+        timings.append(time.perf_counter() - start)
+
+    result = {"seconds": min(timings), "peak_rss": _peak_rss_bytes()}
+    if trace_alloc:
+        tracemalloc.start()
+        action(data)
+        result["peak_alloc"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def ensure_roster(data_dir: str, size: int, seed: int) -> str:
+    """Создает (или берет из кэша) синтетический CSV нужного размера."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"roster_{size}_{seed}.csv")
+    if not os.path.exists(path):
+        write_roster_csv(path, size, seed)
+    return path
+
+
+def run_suite(sizes: List[int], operations: List[str], data_dir: str, seed: int,
+              repeat: int, trace_alloc: bool) -> dict:
+    results = {}
+    for size in sizes:
+        path = ensure_roster(data_dir, size, seed)
+        for operation in operations:
+            # Новый процесс на каждый замер: чистый пиковый RSS
+            with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+                case = executor.submit(run_case, operation, path, repeat, trace_alloc).result()
+            results[f"{operation}@{size}"] = case
+            print(f"{operation:<28} {size:>10,}  {case['seconds']:9.4f} с  "
+                  f"RSS {case['peak_rss'] / 2**20:8.1f} МБ", file=sys.stderr)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "seed": seed, "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Возвращает список регрессий времени относительно базы."""
+    regressions = []
+    print(f"\n{'Замер':<40} {'база, с':>10} {'сейчас, с':>10} {'изм.':>8}")
+    for key, case in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        change = case["seconds"] / base["seconds"] - 1 if base["seconds"] else 0.0
+        mark = ""
+        if change > tolerance:
+            mark = "  РЕГРЕССИЯ"
+            regressions.append(key)
+        print(f"{key:<40} {base['seconds']:>10.4f} {case['seconds']:>10.4f} {change:>+7.1%}{mark}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки загрузки, сохранения и обработки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="повторов на замер (берется лучший)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "lab2-bench"),
+                        help="кэш сгенерированных файлов")
+    parser.add_argument("--trace-alloc", action="store_true", help="пик выделений через tracemalloc")
+    parser.add_argument("--save-baseline", help="сохранить результаты как базу (JSON)")
+    parser.add_argument("--baseline", help="сравнить с базой (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое замедление (доля)")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.sizes, args.operations, args.data_dir, args.seed,
+                        args.repeat, args.trace_alloc)
+
+    if args.save_baseline:
+        with open(args.save_baseline, mode='w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, mode='r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
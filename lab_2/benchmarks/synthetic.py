@@ -0,0 +1,57 @@
+"""
+Генератор синтетических списков студентов для бенчмарков.
+Результат полностью определяется seed: одинаковые параметры дают
+байт-в-байт одинаковые файлы. Имена кириллические (включая Ё),
+количество оценок у студентов разное; в CSV добавляются заголовок
+и пустые строки, как в реальных выгрузках.
+"""
+import random
+from typing import Iterator, List, Tuple
+
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Ёлкин", "Елкин", "Жуков", "Орлов",
+            "Яковлев", "Абрамов", "Фёдоров", "Соколов", "Смирнов", "Кузнецов"]
+GIVEN_NAMES = ["Иван", "Пётр", "Олег", "Фёдор", "Сергей", "Артём", "Михаил"]
+FEMALE_GIVEN_NAMES = ["Анна", "Алёна", "Мария", "Ольга", "Дарья", "Наталья"]
+
+Row = Tuple[int, str, List[int]]
+
+
+def iter_roster(count: int, seed: int = 42, min_grades: int = 0, max_grades: int = 8) -> Iterator[Row]:
+    """Генерирует строки (id, name, grades) для count студентов."""
+    rng = random.Random(seed)
+    for student_id in range(1, count + 1):
+        surname = rng.choice(SURNAMES)
+        if rng.random() < 0.5:
+            name = f"{surname}а {rng.choice(FEMALE_GIVEN_NAMES)}"
+        else:
+            name = f"{surname} {rng.choice(GIVEN_NAMES)}"
+        grades = [rng.randint(0, 100) for _ in range(rng.randint(min_grades, max_grades))]
+        yield student_id, name, grades
+
+
+def write_roster_csv(path: str, count: int, seed: int = 42, max_grades: int = 8,
+                     blank_line_ratio: float = 0.01) -> int:
+    """
+    Записывает синтетический CSV: заголовок, строки студентов,
+    случайные пустые строки. Возвращает число строк в файле.
+    """
+    rng = random.Random(seed + 1)
+    header = "id,name," + ",".join(f"grade{i + 1}" for i in range(max_grades))
+    lines = 1
+
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        f.write(header + "\n")
+        buffer = []
+        for student_id, name, grades in iter_roster(count, seed, max_grades=max_grades):
+            if rng.random() < blank_line_ratio:
+                buffer.append("\n")
+            padding = "," * (max_grades - len(grades))
+            buffer.append(f"{student_id},{name},{','.join(map(str, grades))}{padding}\n")
+            if len(buffer) >= 10_000:
+                lines += len(buffer)
+                f.write("".join(buffer))
+                buffer.clear()
+        lines += len(buffer)
+        f.write("".join(buffer))
+
+    return lines
@@ -0,0 +1,175 @@
+"""
+Асинхронный интерфейс ввода-вывода для asyncio.
+Блокирующие чтение, разбор и запись из lab.io_utils выполняются в
+пуле потоков (executor) пачками ограниченного размера, поэтому цикл
+событий не блокируется. Операции поддерживают отмену: задача
+прерывается на границе пачки (или студента при записи), а
+незавершенный выходной файл удаляется.
+"""
+import asyncio
+import contextlib
+import os
+import threading
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Sequence, TypeVar, Union
+
+import lab.io_utils as io
+from lab.models import Student, ValidationPolicy
+from lab.processing import select_top_n
+
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_CONCURRENCY = 4
+
+T = TypeVar('T')
+
+
+class _Cancelled(Exception):
+    """Сигнал рабочему потоку прекратить операцию (задача asyncio отменена)."""
+
+
+def _checked(items: Iterable[T], cancelled: threading.Event) -> Iterator[T]:
+    """Пропускает элементы, пока операция не отменена."""
+    for item in items:
+        if cancelled.is_set():
+            raise _Cancelled()
+        yield item
+
+
+async def _run_cancellable(func: Callable[[threading.Event], T],
+                           executor: Optional[Executor] = None) -> T:
+    """
+    Выполняет func(cancelled) в executor. При отмене задачи выставляет
+    флаг cancelled и дожидается, пока поток остановится, и только
+    затем пробрасывает CancelledError.
+    """
+    cancelled = threading.Event()
+    future = asyncio.get_running_loop().run_in_executor(executor, func, cancelled)
+    try:
+        # shield: отмена задачи не должна «отпускать» еще работающий поток
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancelled.set()
+        with contextlib.suppress(Exception):
+            await future
+        raise
+
+
+async def aiter_student_batches(filepath: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                                validate: ValidationPolicy = 'strict',
+                                executor: Optional[Executor] = None) -> AsyncIterator[List[Student]]:
+    """
+    Асинхронно читает студентов (CSV или снимок) пачками по batch_size студентов.
+    Каждая пачка разбирается в executor; в памяти — не больше одной пачки.
+    """
+    loop = asyncio.get_running_loop()
+    batches = io.iter_student_batches(filepath, batch_size, validate)
+    pending = None
+    try:
+        while True:
+            pending = loop.run_in_executor(executor, next, batches, None)
+            batch = await asyncio.shield(pending)
+            if batch is None:
+                return
+            yield batch
+    finally:
+        if pending is not None and not pending.done():
+            # Генератор еще выполняется в потоке: закрываем его по завершении
+            pending.add_done_callback(lambda _: batches.close())
+        else:
+            batches.close()
+
+
+async def aload_students(filepath: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                         validate: ValidationPolicy = 'strict',
+                         executor: Optional[Executor] = None) -> List[Student]:
+    """Асинхронный аналог load_students (CSV или снимок, с журналом изменений)."""
+    students = []
+    async for batch in aiter_student_batches(filepath, batch_size, validate, executor):
+        students.extend(batch)
+    return students
+
+
+async def aload_many(paths: Sequence[str], concurrency: int = DEFAULT_CONCURRENCY,
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     validate: ValidationPolicy = 'strict',
+                     executor: Optional[Executor] = None) -> List[List[Student]]:
+    """
+    Загружает несколько файлов одновременно, не более concurrency сразу.
+    Результаты возвращаются в порядке paths.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load_one(path: str) -> List[Student]:
+        async with semaphore:
+            return await aload_students(path, batch_size, validate, executor)
+
+    return list(await asyncio.gather(*(load_one(path) for path in paths)))
+
+
+def _remove_partial(filepath: str):
+    with contextlib.suppress(OSError):
+        os.remove(filepath)
+
+
+async def asave_students(filepath: str, students: Iterable[Student],
+                         grades_width: Optional[int] = None,
+                         compression: Optional[io.Compression] = None,
+                         executor: Optional[Executor] = None):
+    """
+    Асинхронно сохраняет студентов (CSV или снимок .snap).
+    Для CSV — потоковая запись write_students_csv; при отмене
+    недописанный файл удаляется. Ширина оценок (если не задана)
+    считается отдельным проходом в executor, не в цикле событий.
+    """
+    is_snapshot = filepath.endswith(io.SNAPSHOT_SUFFIX)
+    if grades_width is None and not is_snapshot and iter(students) is students:
+        raise ValueError("Для потока студентов нужно явно указать grades_width.")
+
+    def write(cancelled: threading.Event, writing: threading.Event):
+        width = grades_width
+        if width is None and not is_snapshot:
+            width = max((s.grades_count for s in _checked(students, cancelled)), default=0)
+        source = _checked(students, cancelled)
+        writing.set()
+        if is_snapshot:
+            io.save_snapshot(filepath, source)
+        else:
+            io.write_students_csv(filepath, source, width, compression)
+
+    await _run_cleaning_up(filepath, write, executor)
+
+
+async def aexport_top(filepath: str, source: Union[str, Iterable[Student]], n: int,
+                      compression: Optional[io.Compression] = None,
+                      executor: Optional[Executor] = None) -> int:
+    """
+    Асинхронно выбирает ТОП-N (из файла или коллекции) и экспортирует его.
+    Возвращает число записанных студентов.
+    """
+    def export(cancelled: threading.Event, writing: threading.Event) -> int:
+        students = io.iter_students(source) if isinstance(source, str) else source
+        top = select_top_n(_checked(students, cancelled), n)
+        if cancelled.is_set():
+            raise _Cancelled()
+        writing.set()
+        io.export_top_students_to_csv(filepath, top, compression)
+        return len(top)
+
+    return await _run_cleaning_up(filepath, export, executor)
+
+
+async def _run_cleaning_up(filepath: str,
+                           func: Callable[[threading.Event, threading.Event], T],
+                           executor: Optional[Executor]) -> T:
+    """
+    Запускает запись файла: func(cancelled, writing) выставляет writing
+    перед открытием файла. При отмене удаляется только файл, запись
+    которого уже началась.
+    """
+    writing = threading.Event()
+    try:
+        return await _run_cancellable(lambda cancelled: func(cancelled, writing), executor)
+    except asyncio.CancelledError:
+        if writing.is_set():
+            _remove_partial(filepath)
+        raise
@@ -0,0 +1,181 @@
+"""
+Модуль пакетной обработки многих групп.
+Загружает и анализирует файлы групп (каталог, glob-шаблон или список)
+параллельно в пуле процессов, сохраняет статистику по каждой группе
+и сводный отчет. Частичные результаты объединяются через
+GroupStatsAccumulator и GradeDistribution, порядок в отчетах
+детерминирован (по отсортированным путям) и не зависит от того,
+какой процесс закончил первым.
+"""
+import contextlib
+import glob
+import io as std_io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Union
+
+import lab.io_utils as io
+from lab.models import ValidationPolicy
+from lab.processing import GroupStatsAccumulator
+from lab.distribution import GradeDistribution
+from lab.errors import AppError, DataSourceError
+
+# Расширения файлов групп при поиске в каталоге
+GROUP_FILE_PATTERNS = ("*.csv", "*.csv.gz", "*.csv.xz", "*" + io.SNAPSHOT_SUFFIX)
+
+REPORT_FILENAME = "report.json"
+
+
+@dataclass
+class GroupResult:
+    """Результат анализа одной группы (или текст ошибки)."""
+    path: str
+    stats: GroupStatsAccumulator = field(default_factory=GroupStatsAccumulator)
+    distribution: GradeDistribution = field(default_factory=GradeDistribution)
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        if self.error is not None:
+            return {"file": self.path, "error": self.error}
+        return {"file": self.path, **self.stats.result().to_dict(),
+                "distribution": self.distribution.to_dict()}
+
+
+@dataclass
+class BatchReport:
+    """Сводный отчет: результаты по группам в порядке путей и общий итог."""
+    groups: List[GroupResult]
+    total: GroupResult
+
+    @property
+    def failed(self) -> List[GroupResult]:
+        return [g for g in self.groups if g.error is not None]
+
+    def to_dict(self) -> dict:
+        return {
+            "groups": [g.to_dict() for g in self.groups],
+            "total": self.total.to_dict(),
+            "failed": len(self.failed),
+        }
+
+
+def find_group_files(source: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Возвращает отсортированный список файлов групп.
+    source — каталог, glob-шаблон или список путей.
+    """
+    if not isinstance(source, str):
+        return sorted(source)
+
+    if os.path.isdir(source):
+        paths = set()
+        for pattern in GROUP_FILE_PATTERNS:
+            paths.update(glob.glob(os.path.join(source, pattern)))
+        return sorted(paths)
+
+    paths = sorted(glob.glob(source))
+    if not paths:
+        raise DataSourceError(f"Не найдено файлов групп: {source}")
+    return paths
+
+
+def analyse_group(path: str, validate: ValidationPolicy = 'strict') -> GroupResult:
+    """
+    Потоково анализирует одну группу. Выполняется в рабочем процессе,
+    поэтому ошибки данных возвращаются в результате, а не выбрасываются.
+    """
+    result = GroupResult(path)
+    try:
+        # Сообщения загрузчика о заголовках из многих процессов не выводим
+        with contextlib.redirect_stdout(std_io.StringIO()):
+            for s in io.iter_students(path, validate):
+                result.stats.add(s)
+                result.distribution.update(s.grades)
+    except AppError as e:
+        return GroupResult(path, error=str(e))
+    return result
+
+
+def print_progress(done: int, total: int, path: str):
+    """Вывод прогресса по умолчанию (в stderr, чтобы не мешать выводу отчета)."""
+    print(f"[{done}/{total}] {path}", file=sys.stderr)
+
+
+def run_groups(source: Union[str, Sequence[str]], workers: Optional[int] = None,
+               output_dir: Optional[str] = None,
+               validate: ValidationPolicy = 'strict',
+               progress: Optional[Callable[[int, int, str], None]] = print_progress) -> BatchReport:
+    """
+    Анализирует все группы из source на пуле из workers процессов.
+    Если указан output_dir, сохраняет в него <группа>.stats.json
+    для каждой группы (см. group_report_names) и сводный report.json.
+    """
+    paths = find_group_files(source)
+    results: List[Optional[GroupResult]] = [None] * len(paths)
+
+    if workers == 1 or len(paths) <= 1:
+        for i, path in enumerate(paths):
+            results[i] = analyse_group(path, validate)
+            if progress:
+                progress(i + 1, len(paths), path)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(analyse_group, path, validate): i
+                       for i, path in enumerate(paths)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                results[i] = future.result()
+                if progress:
+                    progress(done, len(paths), paths[i])
+
+    # Объединение строго в порядке путей: итог не зависит от порядка завершения
+    total = GroupResult("total")
+    for result in results:
+        if result.error is None:
+            total.stats.merge(result.stats)
+            total.distribution.merge(result.distribution)
+
+    report = BatchReport(results, total)
+    if output_dir is not None:
+        save_report(report, output_dir)
+    return report
+
+
+def group_report_names(paths: Sequence[str]) -> List[str]:
+    """
+    Возвращает для каждого файла группы уникальное имя отчета:
+    путь относительно общего каталога всех файлов, так что
+    terms/fall/group.csv и terms/spring/group.csv не совпадают.
+    Для файлов из одного каталога это просто имя файла.
+    """
+    if not paths:
+        return []
+    paths = [os.path.abspath(path) for path in paths]
+    try:
+        root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    except ValueError:
+        # Пути на разных дисках: общего каталога нет
+        return [f"{i}_{os.path.basename(path)}" for i, path in enumerate(paths)]
+    return [os.path.relpath(path, root) for path in paths]
+
+
+def save_report(report: BatchReport, output_dir: str):
+    """
+    Сохраняет статистику по каждой группе и сводный отчет в output_dir.
+    Отчеты групп повторяют структуру каталогов относительно их общего корня.
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        names = group_report_names([group.path for group in report.groups])
+        for group, name in zip(report.groups, names):
+            target = os.path.join(output_dir, f"{name}.stats.json")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, mode='w', encoding='utf-8') as f:
+                json.dump(group.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(os.path.join(output_dir, REPORT_FILENAME), mode='w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        raise DataSourceError(f"Не удалось сохранить отчет: {e}")
@@ -0,0 +1,210 @@
+"""
+Неинтерактивный (пакетный) интерфейс командной строки.
+Подкоманды работают потоково от файла к файлу и печатают результат
+в JSON, поэтому подходят для cron и конвейеров. Интерактивное меню
+(lab.main) при этом не загружается.
+
+Примеры:
+    python -m lab.cli stats data/students.csv
+    python -m lab.cli top data/students.csv -n 10
+    python -m lab.cli sort data/students.csv sorted.csv --by name
+    python -m lab.cli export data/students.csv top.csv -n 10
+    python -m lab.cli convert data/students.csv students.snap
+    python -m lab.cli groups "groups/*.csv" -o reports -j 8
+    python -m lab.cli --profile --profile-format prometheus stats data/students.csv
+    python -m lab.cli --max-errors 100 --quarantine bad.csv convert big.csv clean.csv
+"""
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from typing import Iterator, List, Optional
+
+import lab.io_utils as io
+import lab.processing as proc
+from lab.models import Student
+from lab.distribution import GradeDistribution
+from lab.batch import run_groups
+from lab.journal import discard_journal
+from lab.errors import AppError
+from lab.rejects import RejectCollector
+from lab import instrumentation as instr
+
+
+def _iter_source(path: str, args: argparse.Namespace,
+                 errors: Optional[RejectCollector] = None) -> Iterator[Student]:
+    """
+    Потоково читает студентов из CSV или бинарного снимка.
+    В терпимом режиме (--max-errors/--quarantine) плохие строки
+    собираются в args.rejects, если не передан другой накопитель.
+    """
+    return io.iter_students(path, args.validate,
+                            errors if errors is not None else args.rejects)
+
+
+def _student_dict(s: Student) -> dict:
+    return {"id": s.id, "name": s.name, "average": round(s.average_grade, 2), "grades": s.grades}
+
+
+def _write_group(path: str, students: Iterator[Student], grades_width: Optional[int] = None):
+    """Сохраняет студентов в формате, выбранном по расширению выходного файла."""
+    if path.endswith(io.SNAPSHOT_SUFFIX):
+        io.save_snapshot(path, students)
+    else:
+        io.write_students_csv(path, students, grades_width)
+    # Журнал прежнего содержимого файла к новым данным не относится
+    discard_journal(path)
+
+
+def cmd_load(args: argparse.Namespace) -> dict:
+    count = sum(1 for _ in _iter_source(args.file, args))
+    return {"file": args.file, "count": count}
+
+
+def cmd_stats(args: argparse.Namespace) -> dict:
+    # Один проход по файлу: статистика группы и распределение оценок
+    stats = proc.GroupStatsAccumulator()
+    distribution = GradeDistribution()
+    for s in _iter_source(args.file, args):
+        stats.add(s)
+        distribution.update(s.grades)
+    return {"file": args.file, **stats.result().to_dict(), "distribution": distribution.to_dict()}
+
+
+def cmd_sort(args: argparse.Namespace) -> dict:
+    # Сортировка требует всей группы в памяти
+    students = proc.sort_students(list(_iter_source(args.file, args)), args.by)
+    _write_group(args.output, iter(students), max((s.grades_count for s in students), default=0))
+    return {"file": args.output, "count": len(students), "sorted_by": args.by}
+
+
+def cmd_top(args: argparse.Namespace) -> List[dict]:
+    top = proc.get_top_n_students(_iter_source(args.file, args), args.n)
+    return [_student_dict(s) for s in top]
+
+
+def cmd_export(args: argparse.Namespace) -> dict:
+    top = proc.get_top_n_students(_iter_source(args.file, args), args.n)
+    io.export_top_students_to_csv(args.output, top)
+    return {"file": args.output, "count": len(top)}
+
+
+def cmd_convert(args: argparse.Namespace) -> dict:
+    if args.output.endswith(io.SNAPSHOT_SUFFIX):
+        width = None
+    else:
+        # Первый проход — ширина заголовка, второй — запись, оба потоковые.
+        # Отбракованные строки учитываются только во втором проходе
+        first_pass = RejectCollector(keep=0) if args.rejects is not None else None
+        width = max((s.grades_count for s in _iter_source(args.file, args, first_pass)), default=0)
+
+    count = 0
+
+    def counted(students: Iterator[Student]) -> Iterator[Student]:
+        nonlocal count
+        for s in students:
+            count += 1
+            yield s
+
+    _write_group(args.output, counted(_iter_source(args.file, args)), width)
+    return {"file": args.output, "count": count}
+
+
+def cmd_groups(args: argparse.Namespace) -> dict:
+    source = args.source[0] if len(args.source) == 1 else args.source
+    report = run_groups(source, workers=args.workers, output_dir=args.output_dir,
+                        validate=args.validate)
+    return report.to_dict()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m lab.cli",
+                                     description="Пакетная обработка файлов со студентами.")
+    parser.add_argument("--validate", choices=["strict", "fast", "none"], default="strict",
+                        help="политика проверки данных (по умолчанию strict)")
+    parser.add_argument("--max-errors", type=int, default=None,
+                        help="терпимый режим: пропускать плохие строки CSV, но не больше N")
+    parser.add_argument("--quarantine", metavar="FILE",
+                        help="терпимый режим: записать плохие строки CSV в файл карантина")
+    parser.add_argument("--profile", action="store_true",
+                        help="вывести метрики профилирования в stderr")
+    parser.add_argument("--profile-format", choices=["json", "prometheus"], default="json",
+                        help="формат метрик профилирования (по умолчанию json)")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="при профилировании учитывать память (tracemalloc)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("load", help="проверить файл и посчитать студентов")
+    p.add_argument("file")
+    p.set_defaults(handler=cmd_load)
+
+    p = commands.add_parser("stats", help="статистика группы в JSON")
+    p.add_argument("file")
+    p.set_defaults(handler=cmd_stats)
+
+    p = commands.add_parser("sort", help="отсортировать группу и сохранить")
+    p.add_argument("file")
+    p.add_argument("output")
+    p.add_argument("--by", choices=proc.SORT_STRATEGIES, default="id")
+    p.set_defaults(handler=cmd_sort)
+
+    p = commands.add_parser("top", help="ТОП-N студентов в JSON")
+    p.add_argument("file")
+    p.add_argument("-n", type=int, default=10)
+    p.set_defaults(handler=cmd_top)
+
+    p = commands.add_parser("export", help="экспорт ТОП-N в CSV")
+    p.add_argument("file")
+    p.add_argument("output")
+    p.add_argument("-n", type=int, default=10)
+    p.set_defaults(handler=cmd_export)
+
+    p = commands.add_parser("convert", help="преобразовать формат (CSV, .csv.gz, .csv.xz, .snap)")
+    p.add_argument("file")
+    p.add_argument("output")
+    p.set_defaults(handler=cmd_convert)
+
+    p = commands.add_parser("groups", help="параллельная статистика по многим группам")
+    p.add_argument("source", nargs="+", help="каталог, glob-шаблон или список файлов")
+    p.add_argument("-o", "--output-dir", help="куда сохранить статистику групп и report.json")
+    p.add_argument("-j", "--workers", type=int, default=None, help="число процессов")
+    p.set_defaults(handler=cmd_groups)
+
+    return parser
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """Точка входа пакетного режима. Возвращает код завершения."""
+    args = build_parser().parse_args(argv)
+    if args.profile or args.profile_memory:
+        instr.enable(trace_memory=args.profile_memory)
+    args.rejects = None
+    try:
+        if args.max_errors is not None or args.quarantine:
+            args.rejects = RejectCollector(args.max_errors, quarantine_path=args.quarantine)
+        # Служебные сообщения загрузчика уходят в stderr, stdout — только JSON
+        with redirect_stdout(sys.stderr):
+            result = args.handler(args)
+    except AppError as e:
+        print(json.dumps({"error": str(e)}, ensure_ascii=False), file=sys.stderr)
+        return 1
+    finally:
+        if args.rejects is not None:
+            args.rejects.close()
+            # Отчет об отбракованных строках — в stderr, stdout остается результатом команды
+            print(json.dumps({"rejected": args.rejects.to_dict()}, ensure_ascii=False), file=sys.stderr)
+        if instr.is_enabled():
+            _print_profile(args.profile_format, args.command)
+
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+def _print_profile(fmt: str, command: str):
+    """Печатает накопленные метрики в stderr в выбранном формате."""
+    instr.take_memory_snapshot(command)
+    print(instr.to_prometheus() if fmt == "prometheus" else instr.to_json(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(run())
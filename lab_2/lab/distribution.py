@@ -0,0 +1,167 @@
+"""
+Модуль распределения оценок.
+Оценки — целые числа от 0 до 100, поэтому распределение хранится
+как 101 счетчик (по одному на каждую оценку). Это дает точные
+перцентили, медиану, стандартное отклонение и гистограмму за O(N)
+без сортировки, а частичные результаты (по пачкам, файлам,
+процессам) складываются через merge.
+"""
+import math
+from collections import Counter
+from typing import Iterable, List, Tuple, Union
+from lab.models import Student, StudentTable
+from lab.errors import ValidationError
+
+GRADE_MIN = 0
+GRADE_MAX = 100
+
+
+def _check_grade(grade: int):
+    if not GRADE_MIN <= grade <= GRADE_MAX:
+        raise ValidationError(
+            f"Оценка должна быть в диапазоне {GRADE_MIN}-{GRADE_MAX}. Получено: {grade}")
+
+
+class GradeDistribution:
+    """
+    Распределение оценок на 101 корзине.
+    """
+
+    def __init__(self):
+        self._counts = [0] * (GRADE_MAX - GRADE_MIN + 1)
+
+    def add(self, grade: int):
+        """Учитывает одну оценку."""
+        _check_grade(grade)
+        self._counts[grade - GRADE_MIN] += 1
+
+    def update(self, grades: Iterable[int]) -> "GradeDistribution":
+        """
+        Учитывает набор оценок. Оценка вне диапазона (например, при
+        загрузке без проверки) вызывает ValidationError, и тогда
+        распределение не меняется.
+        """
+        counted = Counter(grades)
+        for grade in counted:
+            _check_grade(grade)
+        counts = self._counts
+        for grade, n in counted.items():
+            counts[grade - GRADE_MIN] += n
+        return self
+
+    def merge(self, other: "GradeDistribution") -> "GradeDistribution":
+        """Добавляет к распределению частичный результат other."""
+        self._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        return self
+
+    @property
+    def counts(self) -> Tuple[int, ...]:
+        """Количество каждой оценки: counts[g] — сколько раз встретилась оценка g."""
+        return tuple(self._counts)
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def total(self) -> int:
+        return sum(n * (GRADE_MIN + i) for i, n in enumerate(self._counts))
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Стандартное отклонение (по генеральной совокупности)."""
+        count = self.count
+        if not count:
+            return 0.0
+        squares = sum(n * (GRADE_MIN + i) ** 2 for i, n in enumerate(self._counts))
+        # Суммы целые, поэтому дисперсия считается без накопления погрешности
+        variance = (squares * count - self.total ** 2) / count ** 2
+        return math.sqrt(variance)
+
+    @property
+    def min(self) -> int:
+        return next((GRADE_MIN + i for i, n in enumerate(self._counts) if n), 0)
+
+    @property
+    def max(self) -> int:
+        return next((GRADE_MAX - i for i, n in enumerate(reversed(self._counts)) if n), 0)
+
+    def _value_at(self, rank: int) -> int:
+        """Оценка на позиции rank (с нуля) в отсортированном ряду всех оценок."""
+        seen = 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if rank < seen:
+                return GRADE_MIN + i
+        raise IndexError(rank)
+
+    def percentile(self, p: float) -> float:
+        """
+        Точный перцентиль p (0-100) с линейной интерполяцией между
+        соседними значениями (как numpy.percentile по умолчанию).
+        """
+        if not 0 <= p <= 100:
+            raise ValueError("Перцентиль должен быть в диапазоне 0-100.")
+        count = self.count
+        if not count:
+            return 0.0
+
+        position = p / 100 * (count - 1)
+        lower = math.floor(position)
+        low_value = self._value_at(lower)
+        if lower == position:
+            return float(low_value)
+        high_value = self._value_at(lower + 1)
+        return low_value + (high_value - low_value) * (position - lower)
+
+    @property
+    def median(self) -> float:
+        return self.percentile(50)
+
+    def histogram(self, bin_width: int = 10) -> List[Tuple[int, int, int]]:
+        """
+        Гистограмма: список (от, до, количество) с включительными границами.
+        Последняя корзина включает оценку 100 (0-9, ..., 90-100 при ширине 10).
+        """
+        bins = []
+        for low in range(GRADE_MIN, GRADE_MAX + 1, bin_width):
+            high = low + bin_width - 1
+            if high + 1 >= GRADE_MAX:
+                high = GRADE_MAX
+            bins.append((low, high, sum(self._counts[low - GRADE_MIN:high - GRADE_MIN + 1])))
+            if high == GRADE_MAX:
+                break
+        return bins
+
+    def to_dict(self) -> dict:
+        """Представление для машиночитаемого вывода (JSON)."""
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "std": round(self.std, 2),
+            "min": self.min,
+            "max": self.max,
+            "median": self.median,
+            "p25": self.percentile(25),
+            "p75": self.percentile(75),
+            "p90": self.percentile(90),
+            "histogram": [{"from": low, "to": high, "count": n} for low, high, n in self.histogram()],
+        }
+
+
+def calculate_grade_distribution(students: Union[Iterable[Student], StudentTable]) -> GradeDistribution:
+    """
+    Строит распределение всех оценок группы за один проход.
+    Для StudentTable считает прямо по буферу оценок.
+    """
+    distribution = GradeDistribution()
+    if isinstance(students, StudentTable):
+        return distribution.update(students.grades)
+    for s in students:
+        distribution.update(s.grades)
+    return distribution
@@ -16,4 +16,8 @@ class DataSourceError(AppError):
 
 class StudentNotFoundError(AppError):
     """Исключение, возникающее, если студент с указанным ID не найден."""
-    pass
\ No newline at end of file
+    pass
+
+class DuplicateStudentError(ValidationError):
+    """Исключение, возникающее при добавлении студента с уже существующим ID."""
+    pass
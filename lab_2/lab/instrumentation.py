@@ -0,0 +1,255 @@
+"""
+Модуль инструментирования (профилирования) по запросу.
+Собирает время по фазам (функциям ввода-вывода, обработки и обработчикам меню),
+счетчики (прочитанные и пропущенные строки, байты, ошибки валидации)
+и, при включенной трассировке памяти, пиковые выделения по фазам
+и снимки tracemalloc.
+
+По умолчанию выключено: обернутая функция проверяет один флаг
+и сразу вызывает оригинал. Включается переменной окружения
+LAB_PROFILE (1 — время и счетчики, memory — еще и память)
+или флагом --profile пакетного интерфейса.
+
+Метрики собираются в текущем процессе: работа, выполненная
+в дочерних процессах (load_students_parallel, run_groups),
+учитывается только общим временем вызова.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+# Имена счетчиков, которые ведет загрузчик
+ROWS_PARSED = "rows_parsed"
+ROWS_SKIPPED = "rows_skipped"
+BYTES_READ = "bytes_read"
+VALIDATION_FAILURES = "validation_failures"
+
+# Сколько строк кода с наибольшими выделениями сохраняется в снимке памяти
+SNAPSHOT_TOP = 10
+
+_enabled = False
+_trace_memory = False
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+_timers: Dict[str, Dict[str, float]] = {}
+_snapshots: List[dict] = []
+
+
+def enable(trace_memory: bool = False):
+    """Включает сбор метрик. trace_memory=True запускает tracemalloc."""
+    global _enabled, _trace_memory
+    _enabled = True
+    _trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    """Выключает сбор метрик (накопленные значения сохраняются)."""
+    global _enabled, _trace_memory
+    _enabled = False
+    if _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    """Очищает накопленные метрики."""
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+        _snapshots.clear()
+
+
+def enable_from_env(environ=os.environ):
+    """Включает сбор метрик, если задана переменная LAB_PROFILE."""
+    value = environ.get("LAB_PROFILE", "").strip().lower()
+    if value and value not in ("0", "false", "no", "off"):
+        enable(trace_memory=value == "memory")
+
+
+def incr(name: str, value: int = 1):
+    """Увеличивает счетчик. Без включенного профилирования ничего не делает."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def add_counts(counts: Dict[str, int]):
+    """
+    Добавляет сразу несколько счетчиков.
+    Горячие циклы считают в локальные переменные и сбрасывают
+    их сюда один раз за вызов, а не на каждой строке.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        for name, value in counts.items():
+            if value:
+                _counters[name] = _counters.get(name, 0) + value
+
+
+def _record(phase: str, seconds: float, peak_alloc: Optional[int] = None):
+    with _lock:
+        timer = _timers.get(phase)
+        if timer is None:
+            timer = _timers[phase] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+        timer["calls"] += 1
+        timer["seconds"] += seconds
+        timer["max_seconds"] = max(timer["max_seconds"], seconds)
+        if peak_alloc is not None:
+            timer["peak_alloc"] = max(timer.get("peak_alloc", 0), peak_alloc)
+
+
+class _Phase:
+    """
+    Замер одной фазы: время и, при трассировке памяти, пик выделений.
+    Пик у tracemalloc общий, поэтому у внешней фазы он учитывается
+    только с момента завершения последней вложенной.
+    """
+    __slots__ = ("name", "start", "base")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.base = None
+        if _trace_memory and tracemalloc.is_tracing():
+            # Пик считается относительно памяти на входе в фазу
+            self.base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+
+    def finish(self, seconds: Optional[float] = None):
+        if seconds is None:
+            seconds = time.perf_counter() - self.start
+        peak = None
+        if self.base is not None and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1] - self.base, 0)
+        _record(self.name, seconds, peak)
+
+
+def _instrumented_generator(phase: _Phase, gen):
+    """
+    Проксирует генератор, считая только время внутри него,
+    без времени потребителя между next().
+    """
+    spent = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(gen)
+            finally:
+                spent += time.perf_counter() - start
+            yield item
+    except StopIteration:
+        return
+    finally:
+        gen.close()
+        phase.finish(spent)
+
+
+def timed(phase: str) -> Callable[[F], F]:
+    """
+    Декоратор: учитывает время вызова функции в фазе phase.
+    Для генераторов замер охватывает весь обход, но только время
+    внутри самого генератора. При выключенном профилировании
+    обертка сразу вызывает оригинал.
+    """
+    def decorator(func: F) -> F:
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _enabled:
+                    return func(*args, **kwargs)
+                return _instrumented_generator(_Phase(phase), func(*args, **kwargs))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _enabled:
+                    return func(*args, **kwargs)
+                measure = _Phase(phase)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    measure.finish()
+        return wrapper
+    return decorator
+
+
+def take_memory_snapshot(label: str) -> Optional[dict]:
+    """
+    Сохраняет снимок tracemalloc: текущий и пиковый объем
+    и строки кода с наибольшими выделениями.
+    Без трассировки памяти возвращает None.
+    """
+    if not (_enabled and _trace_memory and tracemalloc.is_tracing()):
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:SNAPSHOT_TOP]
+    snapshot = {
+        "label": label,
+        "current": current,
+        "peak": peak,
+        "top": [{"where": str(stat.traceback), "size": stat.size, "count": stat.count} for stat in stats],
+    }
+    with _lock:
+        _snapshots.append(snapshot)
+    return snapshot
+
+
+def report() -> dict:
+    """Возвращает накопленные метрики словарем."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timers": {name: dict(timer) for name, timer in _timers.items()},
+            "memory_snapshots": list(_snapshots),
+        }
+
+
+def to_json() -> str:
+    return json.dumps(report(), ensure_ascii=False)
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(prefix: str = "lab") -> str:
+    """Возвращает метрики в текстовом формате Prometheus."""
+    data = report()
+    lines = []
+    for name, value in sorted(data["counters"].items()):
+        metric = f"{prefix}_{name}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+
+    timers = sorted(data["timers"].items())
+    if timers:
+        lines.append(f"# TYPE {prefix}_phase_seconds summary")
+        for name, timer in timers:
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{_escape(name)}"}} {timer["seconds"]:.9f}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{_escape(name)}"}} {timer["calls"]}')
+        lines.append(f"# TYPE {prefix}_phase_max_seconds gauge")
+        for name, timer in timers:
+            lines.append(f'{prefix}_phase_max_seconds{{phase="{_escape(name)}"}} {timer["max_seconds"]:.9f}')
+        peaks = [(name, timer["peak_alloc"]) for name, timer in timers if "peak_alloc" in timer]
+        if peaks:
+            lines.append(f"# TYPE {prefix}_phase_peak_alloc_bytes gauge")
+            for name, peak in peaks:
+                lines.append(f'{prefix}_phase_peak_alloc_bytes{{phase="{_escape(name)}"}} {peak}')
+    return "\n".join(lines) + "\n"
+
+
+enable_from_env()
@@ -1,126 +1,795 @@
 """
 Модуль ввода-вывода.
-Отвечает за чтение и запись данных в формате CSV.
+Отвечает за чтение и запись данных в формате CSV
+и в компактном бинарном формате снимков (snapshot).
 """
 import csv
+import gzip
+import io
+import lzma
+import mmap
 import os
-from typing import List
-from lab.models import Student
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import le
+from typing import Iterable, Iterator, List, Literal, NamedTuple, Optional, Sequence, Tuple, Union
+from lab.models import Student, StudentTable, ValidationPolicy
 from lab.errors import DataSourceError, ValidationError
+from lab import instrumentation as instr
+from lab.rejects import RejectCollector
 
-def load_students_from_csv(filepath: str) -> List[Student]:
+# Сжатие CSV файлов средствами стандартной библиотеки
+Compression = Literal['gzip', 'xz']
+_COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.xz': 'xz'}
+
+# Размер буфера записи CSV (байт)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def _detect_compression(filepath: str) -> Optional[Compression]:
+    """Определяет сжатие по расширению файла."""
+    return _COMPRESSION_SUFFIXES.get(os.path.splitext(filepath)[1].lower())
+
+
+def _open_text(filepath: str, mode: str, compression: Optional[Compression] = None,
+               decode_errors: str = 'strict'):
     """
-    Загружает список студентов из CSV файла.
-    Поддерживает файлы с заголовком и без.
-    Формат: id, name, grade1, grade2, ...
+    Открывает CSV файл в текстовом режиме, при необходимости через gzip/lzma.
+    Если compression не указан, он определяется по расширению.
+    decode_errors='surrogateescape' не прерывает чтение на байтах,
+    которые не являются UTF-8 (см. _is_undecodable).
+    """
+    compression = compression or _detect_compression(filepath)
+    if compression == 'gzip':
+        return gzip.open(filepath, mode + 't', encoding='utf-8', errors=decode_errors, newline='')
+    if compression == 'xz':
+        return lzma.open(filepath, mode + 't', encoding='utf-8', errors=decode_errors, newline='')
+    if compression is not None:
+        raise ValueError(f"Неизвестный формат сжатия: {compression}")
+
+    buffering = WRITE_BUFFER_SIZE if 'w' in mode or 'a' in mode else -1
+    return open(filepath, mode=mode, encoding='utf-8', errors=decode_errors, newline='',
+                buffering=buffering)
+
+
+# Причина отбраковки строки, которая не является текстом UTF-8
+UNDECODABLE_REASON = "Некорректная кодировка строки (ожидается UTF-8)."
+
+
+def _is_undecodable(line: str) -> bool:
+    """Есть ли в строке байты не UTF-8 (прочитанные с errors='surrogateescape')."""
+    if line.isascii():
+        return False
+    try:
+        line.encode('utf-8')
+    except UnicodeEncodeError:
+        return True
+    return False
+
+
+def _first_undecodable_line(filepath: str) -> Optional[int]:
+    """Номер первой строки файла, которая не декодируется как UTF-8."""
+    compression = _detect_compression(filepath)
+    opener = gzip.open if compression == 'gzip' else lzma.open if compression == 'xz' else open
+    with opener(filepath, 'rb') as f:
+        for line_no, line in enumerate(f, start=1):
+            try:
+                line.decode('utf-8')
+            except UnicodeDecodeError:
+                return line_no
+    return None
+
+
+def _parse_row(row: List[str], validate: ValidationPolicy = 'strict') -> Optional[Student]:
+    """
+    Преобразует одну строку CSV в объект Student.
+    Возвращает None, если строка является заголовком.
+    При некорректных данных выбрасывает ValueError или ValidationError.
+    """
+    # Очистка пробелов по краям ячеек
+    row = [cell.strip() for cell in row]
+
+    # Если первая колонка не число, считаем это заголовком
+    if not row[0].isdigit():
+        return None
+
+    # Минимум 2 колонки: id и name
+    if len(row) < 2:
+        raise ValueError("Недостаточно колонок (минимум ID и Имя).")
+
+    student_id = int(row[0])
+    name = row[1]
+
+    # Все остальные колонки — оценки. Пропускаем пустые.
+    grades = [int(val) for val in row[2:] if val]
+
+    # Создаем объект
+    return Student.from_values(student_id, name, grades, validate)
+
+
+def _remember_lines(f, holder: list) -> Iterator[str]:
+    """
+    Отдает строки файла модулю csv, попутно складывая их в holder[0].
+    Загрузчик забирает накопленный список перед разбором каждой записи,
+    поэтому исходный текст известен и для записей из нескольких строк.
+    """
+    for line in f:
+        holder[0].append(line)
+        yield line
+
+
+@instr.timed("io.iter_students_from_csv")
+def iter_students_from_csv(filepath: str, validate: ValidationPolicy = 'strict',
+                           errors: Optional[RejectCollector] = None) -> Iterator[Student]:
+    """
+    Потоково читает студентов из CSV файла, по одному за раз.
+    В памяти одновременно находится только текущая строка,
+    поэтому подходит для файлов любого размера.
+    Формат и правила разбора те же, что у load_students_from_csv.
+    Если передан errors, некорректные строки не прерывают чтение,
+    а передаются в него (см. RejectCollector).
     """
     if not os.path.exists(filepath):
         raise DataSourceError(f"Файл не найден: {filepath}")
 
-    students = []
+    # Счетчики ведутся в локальных переменных и сбрасываются
+    # в инструментирование один раз, при завершении чтения
+    parsed = skipped = failures = 0
+    completed = False
 
     try:
-        with open(filepath, mode='r', encoding='utf-8', newline='') as f:
-            reader = csv.reader(f)
+        if errors is not None:
+            # Терпимый режим: байты не UTF-8 не прерывают чтение, а отбраковывают
+            # свою запись. Исходный текст строк нужен для отчета об ошибках
+            f = _open_text(filepath, 'r', decode_errors='surrogateescape')
+            raw_lines = [[]]
+            rows = csv.reader(_remember_lines(f, raw_lines))
+        else:
+            f = _open_text(filepath, 'r')
+            rows = csv.reader(f)
+
+        with f:
+            for row_idx, row in enumerate(rows, start=1):
+                if errors is not None:
+                    row_lines, raw_lines[0] = raw_lines[0], []
 
-            for row_idx, row in enumerate(reader, start=1):
                 if not row:
+                    skipped += 1
                     continue  # Пропуск пустых строк
 
-                # Очистка пробелов по краям ячеек
-                row = [cell.strip() for cell in row]
+                try:
+                    if errors is not None and any(map(_is_undecodable, row_lines)):
+                        raise ValueError(UNDECODABLE_REASON)
+                    student = _parse_row(row, validate)
+                except (ValueError, ValidationError) as e:
+                    failures += 1
+                    if errors is None:
+                        raise DataSourceError(f"Ошибка в строке {row_idx}: {e}")
+                    raw = ''.join(row_lines).rstrip('\r\n')
+                    # Байты не UTF-8 в отчете заменяются на U+FFFD
+                    raw = raw.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+                    errors.add(row_idx, raw, str(e))
+                    continue
 
-                # Если первая колонка не число, считаем это заголовком и пропускаем
-                if not row[0].isdigit():
+                if student is None:
+                    skipped += 1
                     print(f"Skipping header at line {row_idx}")
                     continue
 
-                # Парсинг строки
-                try:
-                    # Минимум 2 колонки: id и name
-                    if len(row) < 2:
-                        raise ValueError("Недостаточно колонок (минимум ID и Имя).")
+                parsed += 1
+                yield student
+        completed = True
 
-                    student_id = int(row[0])
-                    name = row[1]
+    except UnicodeDecodeError:
+        # Текст декодируется блоками, поэтому строка ищется отдельным проходом.
+        # Канал (FIFO) второй раз не прочитать — номер строки не указывается
+        if not os.path.isfile(filepath):
+            raise DataSourceError(f"Ошибка в файле {filepath}: {UNDECODABLE_REASON}")
+        raise DataSourceError(f"Ошибка в строке {_first_undecodable_line(filepath)}: {UNDECODABLE_REASON}")
+    except (OSError, EOFError, lzma.LZMAError) as e:
+        # EOFError и LZMAError — обрезанный или поврежденный сжатый файл
+        raise DataSourceError(f"Ошибка доступа к файлу: {e}")
+    finally:
+        if instr.is_enabled():
+            instr.add_counts({
+                instr.ROWS_PARSED: parsed,
+                instr.ROWS_SKIPPED: skipped,
+                instr.VALIDATION_FAILURES: failures,
+                # Байты учитываются для файлов, прочитанных до конца
+                instr.BYTES_READ: os.path.getsize(filepath) if completed else 0,
+            })
 
-                    # Все остальные колонки — оценки. Пропускаем пустые.
-                    grades = []
-                    for val in row[2:]:
-                        if val:
-                            grades.append(int(val))
 
-                    # Создаем объект
-                    student = Student(student_id, name, grades)
-                    students.append(student)
+@instr.timed("io.iter_student_batches")
+def iter_student_batches(filepath: str, batch_size: int = 10_000,
+                         validate: ValidationPolicy = 'strict',
+                         errors: Optional[RejectCollector] = None) -> Iterator[List[Student]]:
+    """
+    Потоково читает студентов пачками по batch_size штук (формат
+    и журнал изменений — как у iter_students).
+    Последняя пачка может быть короче.
+    """
+    if batch_size <= 0:
+        raise ValueError("Размер пачки должен быть положительным.")
 
-                except (ValueError, ValidationError) as e:
-                    raise DataSourceError(f"Ошибка в строке {row_idx}: {e}")
+    students = iter_students(filepath, validate, errors)
+    try:
+        while True:
+            batch = list(islice(students, batch_size))
+            if not batch:
+                return
+            yield batch
+    finally:
+        # При досрочном закрытии сразу освобождаем файл
+        close = getattr(students, 'close', None)
+        if close is not None:
+            close()
+
+
+@instr.timed("io.load_students_from_csv")
+def load_students_from_csv(filepath: str, validate: ValidationPolicy = 'strict',
+                           errors: Optional[RejectCollector] = None) -> List[Student]:
+    """
+    Загружает список студентов из CSV файла.
+    Поддерживает файлы с заголовком и без.
+    Формат: id, name, grade1, grade2, ...
+    validate задает политику проверки (см. ValidationPolicy):
+    для доверенных массовых импортов подходят 'fast' и 'none'.
+    errors включает терпимый режим: за один проход получаются
+    корректные студенты и все отбракованные строки с причинами,
+    а DataSourceError возникает только при превышении порога ошибок.
+    """
+    return list(iter_students_from_csv(filepath, validate, errors))
+
+class _ChunkResult(NamedTuple):
+    """Результат разбора одного фрагмента файла в рабочем процессе."""
+    table: StudentTable             # Колонки передаются байтами, а не объектами Student
+    rows: int                       # Сколько строк CSV прочитано во фрагменте
+    header_rows: List[int]          # Локальные номера строк-заголовков
+    error: Optional[Tuple[int, str]]  # (локальный номер строки, текст ошибки)
+    quote_open: bool = False        # Фрагмент кончается внутри поля в кавычках
+
+
+def _split_file(filepath: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Делит файл на диапазоны байт [start, end) примерно по chunk_size,
+    сдвигая каждую границу на начало следующей строки.
+    """
+    size = os.path.getsize(filepath)
+    ranges = []
+    start = 0
+
+    with open(filepath, mode='rb') as f:
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()  # Дочитываем до конца строки
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def _load_chunk(filepath: str, start: int, end: Optional[int],
+                validate: ValidationPolicy = 'strict') -> _ChunkResult:
+    """
+    Разбирает фрагмент файла [start, end). Выполняется в рабочем процессе,
+    поэтому ничего не печатает и не выбрасывает DataSourceError:
+    заголовки и ошибка возвращаются с локальными номерами строк.
+    Нечетное число кавычек во фрагменте, за которым есть еще данные,
+    значит, что поле в кавычках (с переводом строки внутри) переходит
+    через его конец: тогда фрагмент не разбирается, а возвращается
+    quote_open=True.
+    """
+    table = StudentTable.from_students(())
+    if _detect_compression(filepath):
+        # Сжатый файл нельзя делить по байтам — он разбирается целиком
+        try:
+            with _open_text(filepath, 'r') as f:
+                text = f.read()
+        except UnicodeDecodeError:
+            return _ChunkResult(table, 0, [], (_first_undecodable_line(filepath), UNDECODABLE_REASON))
+    else:
+        with open(filepath, mode='rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(start)
+            data = f.read() if end is None else f.read(end - start)
+        if end is not None and end < size and data.count(b'"') % 2:
+            return _ChunkResult(table, 0, [], None, quote_open=True)
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            return _ChunkResult(table, 0, [], (data.count(b'\n', 0, e.start) + 1, UNDECODABLE_REASON))
+
+    header_rows = []
+    row_idx = 0
+    reader = csv.reader(io.StringIO(text, newline=''))
+
+    for row_idx, row in enumerate(reader, start=1):
+        if not row:
+            continue
+
+        try:
+            student = _parse_row(row, validate)
+        except (ValueError, ValidationError) as e:
+            return _ChunkResult(table, row_idx, header_rows, (row_idx, str(e)))
+
+        if student is None:
+            header_rows.append(row_idx)
+        else:
+            table.append(student)
+
+    return _ChunkResult(table, row_idx, header_rows, None)
+
+
+@instr.timed("io.load_students_parallel")
+def load_students_parallel(source: Union[str, Sequence[str]], workers: Optional[int] = None,
+                           chunk_size: int = 32 * 1024 * 1024,
+                           validate: ValidationPolicy = 'strict',
+                           as_table: bool = False) -> Union[List[Student], StudentTable]:
+    """
+    Параллельно загружает студентов в пуле процессов.
+    source — путь к одному файлу (он делится на фрагменты по границам строк)
+    или список файлов-шардов (каждый разбирается целиком).
+    Результат, сообщения о заголовках и ошибки — те же, что у
+    load_students_from_csv, с глобальными номерами строк.
+    Рабочие процессы возвращают колонки (StudentTable), объекты Student
+    создаются в основном процессе одним проходом; as_table=True
+    возвращает StudentTable без этого шага.
+    Если поле в кавычках с переводом строки попадает на границу
+    фрагментов, файл загружается последовательно (load_students_from_csv).
+    """
+    paths = [source] if isinstance(source, str) else list(source)
+    for path in paths:
+        if not os.path.exists(path):
+            raise DataSourceError(f"Файл не найден: {path}")
+
+    try:
+        if isinstance(source, str) and _detect_compression(source):
+            tasks = [(source, 0, None, validate)]
+        elif isinstance(source, str):
+            tasks = [(source, start, end, validate) for start, end in _split_file(source, chunk_size)]
+        else:
+            tasks = [(path, 0, None, validate) for path in paths]
+
+        if workers == 1 or len(tasks) <= 1:
+            results = [_load_chunk(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_load_chunk, *zip(*tasks)))
 
     except OSError as e:
         raise DataSourceError(f"Ошибка доступа к файлу: {e}")
 
-    return students
+    if isinstance(source, str) and any(r.quote_open for r in results):
+        # Граница фрагмента внутри поля в кавычках: по байтам файл не делится
+        students = load_students_from_csv(source, validate=validate)
+        return StudentTable.from_students(students) if as_table else students
+
+    tables = []
+    line_offset = 0
+
+    for (path, start, _, _), result in zip(tasks, results):
+        if start == 0:
+            line_offset = 0  # Новый файл — нумерация строк с начала
+        # Для шардов указываем файл, иначе номер строки неоднозначен
+        prefix = "" if isinstance(source, str) else f"{path}: "
+
+        for local_idx in result.header_rows:
+            print(f"Skipping header at line {line_offset + local_idx}")
+
+        if result.error is not None:
+            local_idx, message = result.error
+            instr.incr(instr.VALIDATION_FAILURES)
+            raise DataSourceError(f"{prefix}Ошибка в строке {line_offset + local_idx}: {message}")
+
+        tables.append(result.table)
+        line_offset += result.rows
+
+    table = StudentTable.concat(tables)
+    if instr.is_enabled():
+        instr.add_counts({
+            instr.ROWS_PARSED: len(table),
+            instr.ROWS_SKIPPED: sum(r.rows for r in results) - len(table),
+            instr.BYTES_READ: sum(os.path.getsize(path) for path in paths),
+        })
+    return table if as_table else table.to_students()
+
+
+def _csv_rows(students: Iterable[Student], grades_width: int) -> Iterator[list]:
+    """Строки CSV для сохранения, дополненные до grades_width колонок оценок."""
+    for s in students:
+        grades = s.grades
+        if len(grades) > grades_width:
+            raise DataSourceError(
+                f"У студента с ID {s.id} оценок больше, чем колонок в заголовке ({grades_width})."
+            )
+        # Добиваем пустыми значениями, если оценок меньше максимума
+        yield [s.id, s.name, *grades, *([""] * (grades_width - len(grades)))]
 
+
+def _top_rows(students: Iterable[Student]) -> Iterator[list]:
+    """Строки CSV для экспорта ТОП студентов."""
+    for s in students:
+        yield [s.id, s.name, f"{s.average_grade:.2f}", " ".join(map(str, s.grades))]
+
+
+def _write_csv(filepath: str, header: List[str], rows: Iterable[list],
+               compression: Optional[Compression], batch_size: int = 1_000):
+    """
+    Записывает заголовок и строки пачками через буфер большого размера.
+    OSError пробрасывается вызывающему коду.
+    """
+    with _open_text(filepath, 'w', compression) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            writer.writerows(batch)
+
+
+@instr.timed("io.write_students_csv")
+def write_students_csv(filepath: str, students: Iterable[Student],
+                       grades_width: Optional[int] = None,
+                       compression: Optional[Compression] = None):
+    """
+    Потоково сохраняет студентов в CSV.
+    Ширина заголовка (число колонок оценок) берется из grades_width.
+    Если она не указана, выполняется первый проход по students для
+    поиска максимума — поэтому для одноразового итератора (например,
+    потока из iter_students_from_csv) grades_width обязателен.
+    compression: 'gzip', 'xz' или None (определяется по расширению .gz/.xz).
+    """
+    if grades_width is None:
+        if iter(students) is students:
+            raise ValueError("Для потока студентов нужно явно указать grades_width.")
+        # Первый проход: максимальное количество оценок для заголовка
+        grades_width = max((s.grades_count for s in students), default=0)
+
+    header = ["id", "name"] + [f"grade{i+1}" for i in range(grades_width)]
+
+    try:
+        _write_csv(filepath, header, _csv_rows(students, grades_width), compression)
+    except OSError as e:
+        raise DataSourceError(f"Не удалось записать файл: {e}")
+
+
+@instr.timed("io.save_students_to_csv")
 def save_students_to_csv(filepath: str, students: List[Student]):
     """
     Сохраняет список студентов в CSV.
     Выравнивает количество колонок оценок по максимуму в группе.
     """
-    if not students:
-        # Если список пуст, создаем пустой файл или файл только с заголовком
-        try:
-            with open(filepath, mode='w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(["id", "name"])
-            return
-        except OSError as e:
-            raise DataSourceError(f"Не удалось записать файл: {e}")
+    write_students_csv(filepath, students)
+
+
+@instr.timed("io.export_top_students_to_csv")
+def export_top_students_to_csv(filepath: str, students: Iterable[Student],
+                               compression: Optional[Compression] = None):
+    """
+    Экспорт ТОП студентов в специальном формате.
+    Принимает любой итерируемый источник и пишет его потоково.
+    """
+    header = ["id", "name", "average", "grades_str"]
+
+    try:
+        _write_csv(filepath, header, _top_rows(students), compression)
+    except OSError as e:
+        raise DataSourceError(f"Не удалось экспортировать файл: {e}")
+
+
+# Бинарные снимки
+#
+# Формат (все числа little-endian, секции выровнены по 8 байт):
+#   заголовок  — магическая строка, версия, число студентов,
+#                размер блока имен, число оценок;
+#   ids        — int64 × count;
+#   names      — для каждого имени: uint32 длина + байты UTF-8;
+#   offsets    — uint64 × (count + 1), границы оценок каждого студента;
+#   grades     — uint8 × число оценок.
+
+SNAPSHOT_MAGIC = b'LABSNAP\0'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = '.snap'
+
+_SNAPSHOT_HEADER = struct.Struct('<8sIQQQ')
+_NAME_LENGTH = struct.Struct('<I')
+
 
-    # Определяем максимальное количество оценок для заголовка
-    max_grades_count = max(len(s.grades) for s in students)
+def _aligned(size: int) -> int:
+    """Округляет размер вверх до кратного 8."""
+    return (size + 7) & ~7
 
-    # Формируем заголовок
-    header = ["id", "name"] + [f"grade{i+1}" for i in range(max_grades_count)]
 
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def is_snapshot(filepath: str) -> bool:
+    """
+    Проверяет по магической строке, является ли файл бинарным снимком.
+    Снимок отображается в память, поэтому им может быть только обычный файл;
+    каналы (FIFO, <(...)) не читаются здесь, чтобы их данные достались загрузчику CSV.
+    """
+    if not os.path.isfile(filepath):
+        return False
     try:
-        with open(filepath, mode='w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
+        with open(filepath, mode='rb') as f:
+            return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+    except OSError:
+        return False
+
 
-            for s in students:
-                row = [s.id, s.name] + s.grades
+@instr.timed("io.save_snapshot")
+def save_snapshot(filepath: str, students: Union[Iterable[Student], StudentTable]):
+    """
+    Сохраняет студентов в бинарный снимок.
+    Принимает список Student или готовую StudentTable.
+    """
+    table = students if isinstance(students, StudentTable) else StudentTable.from_students(students)
 
-                # Добиваем пустыми значениями, если оценок меньше максимума
-                padding = [""] * (max_grades_count - len(s.grades))
-                row.extend(padding)
+    names_blob = bytearray()
+    for name in table.names:
+        encoded = name.encode('utf-8')
+        names_blob += _NAME_LENGTH.pack(len(encoded))
+        names_blob += encoded
 
-                writer.writerow(row)
+    grades = table.grades if isinstance(table.grades, array) else array('B', table.grades)
+    sections = [
+        _to_little_endian(array('q', table.ids)),
+        bytes(names_blob),
+        _to_little_endian(array('Q', table.offsets)),
+        grades.tobytes(),
+    ]
+    header = _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(table),
+                                   len(names_blob), len(grades))
 
+    try:
+        with open(filepath, mode='wb') as f:
+            for chunk in [header] + sections:
+                f.write(chunk)
+                f.write(bytes(_aligned(len(chunk)) - len(chunk)))
     except OSError as e:
         raise DataSourceError(f"Не удалось записать файл: {e}")
 
-def export_top_students_to_csv(filepath: str, students: List[Student]):
+
+def _decode_names(buffer, count: int) -> List[str]:
+    names = []
+    pos = 0
+    for _ in range(count):
+        (length,) = _NAME_LENGTH.unpack_from(buffer, pos)
+        pos += _NAME_LENGTH.size
+        names.append(str(buffer[pos:pos + length], 'utf-8'))
+        pos += length
+    if pos != len(buffer):
+        raise ValueError("размер блока имен не совпадает с заголовком")
+    return names
+
+
+# Первые байты UTF-8 всех символов, для которых str.isspace() истинно.
+# Имя, начинающееся с другого байта, заведомо не пустое после strip(),
+# и при проверке его не нужно декодировать
+_SPACE_LEAD_BYTES = frozenset(
+    ch.encode('utf-8')[0]
+    for ch in "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2028\u2029\u202f\u205f\u3000"
+    + "".join(map(chr, range(0x2000, 0x200b)))
+)
+
+
+class _SnapshotNames(Sequence):
     """
-    Экспорт ТОП студентов в специальном формате.
+    Имена из блока снимка, декодируемые при обращении (для lazy=True).
+    Индекс начала каждого имени строится один раз — при первом
+    обращении, проходом только по префиксам длины. При check_names
+    заодно проверяется, что имена не пустые (как name.strip() при
+    полной загрузке); декодируются только имена, начинающиеся
+    с байта, который может быть началом пробельного символа.
     """
-    header = ["id", "name", "average", "grades_str"]
 
-    try:
-        with open(filepath, mode='w', encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
+    def __init__(self, buffer, count: int, filepath: str, check_names: bool = True):
+        self._buffer = buffer
+        self._count = count
+        self._filepath = filepath
+        self._check_names = check_names
+        self._starts = None
+
+    def _index(self) -> array:
+        if self._starts is None:
+            buffer, unpack, check_names = self._buffer, _NAME_LENGTH.unpack_from, self._check_names
+            starts = array('Q')
+            append = starts.append
+            pos = 0
+            try:
+                for _ in range(self._count):
+                    (length,) = unpack(buffer, pos)
+                    pos += _NAME_LENGTH.size
+                    if check_names and (not length or (
+                            buffer[pos] in _SPACE_LEAD_BYTES
+                            and not str(buffer[pos:pos + length], 'utf-8').strip())):
+                        raise ValueError("пустое имя студента")
+                    append(pos)
+                    pos += length
+            except (struct.error, ValueError, IndexError) as e:
+                # UnicodeDecodeError — подкласс ValueError
+                raise DataSourceError(f"Поврежденный файл снимка {self._filepath}: {e}")
+            if pos != len(buffer):
+                raise DataSourceError(
+                    f"Поврежденный файл снимка {self._filepath}: размер блока имен не совпадает с заголовком")
+            append(pos + _NAME_LENGTH.size)  # Конец последнего имени — starts[i + 1] - 4
+            self._starts = starts
+        return self._starts
+
+    def _decode(self, start: int, end: int) -> str:
+        try:
+            return str(self._buffer[start:end], 'utf-8')
+        except UnicodeDecodeError as e:
+            raise DataSourceError(f"Поврежденный файл снимка {self._filepath}: {e}")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Индекс за пределами блока имен.")
+        starts = self._index()
+        return self._decode(starts[index], starts[index + 1] - _NAME_LENGTH.size)
+
+    def __iter__(self) -> Iterator[str]:
+        starts = self._index()
+        decode, size = self._decode, _NAME_LENGTH.size
+        for start, nxt in zip(starts, islice(starts, 1, None)):
+            yield decode(start, nxt - size)
 
-            for s in students:
-                grades_str = " ".join(map(str, s.grades))
+    def __len__(self) -> int:
+        return self._count
 
-                row = [
-                    s.id,
-                    s.name,
-                    f"{s.average_grade:.2f}",
-                    grades_str
-                ]
-                writer.writerow(row)
 
+@instr.timed("io.load_snapshot")
+def load_snapshot(filepath: str, lazy: bool = False,
+                  validate: ValidationPolicy = 'fast') -> StudentTable:
+    """
+    Загружает бинарный снимок в StudentTable.
+    При lazy=True файл отображается в память через mmap, и колонки
+    ids, offsets и grades читаются прямо из него без копирования,
+    а имена декодируются только при обращении к ним.
+    Проверка данных выполняется по колонкам целиком: один min по ids
+    и один max по буферу оценок; validate='none' ее отключает.
+    При lazy=True блок имен проверяется при первом обращении к именам
+    (пустые имена, размер блока, UTF-8) и ошибка выбрасывается тогда же.
+    """
+    if not os.path.exists(filepath):
+        raise DataSourceError(f"Файл не найден: {filepath}")
+
+    try:
+        with open(filepath, mode='rb') as f:
+            if lazy and sys.byteorder == 'little' and os.fstat(f.fileno()).st_size > 0:
+                buffer = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            else:
+                lazy = False
+                buffer = memoryview(f.read())
     except OSError as e:
-        raise DataSourceError(f"Не удалось экспортировать файл: {e}")
\ No newline at end of file
+        raise DataSourceError(f"Ошибка доступа к файлу: {e}")
+
+    try:
+        magic, version, count, names_size, grades_size = _SNAPSHOT_HEADER.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("неизвестный формат")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"неподдерживаемая версия {version}")
+
+        bounds = []
+        pos = _aligned(_SNAPSHOT_HEADER.size)
+        for size in (8 * count, names_size, 8 * (count + 1), grades_size):
+            bounds.append((pos, pos + size))
+            pos += _aligned(size)
+        if bounds[-1][1] > len(buffer):
+            raise ValueError("файл обрезан")
+
+        ids_part, names_part, offsets_part, grades_part = (buffer[a:b] for a, b in bounds)
+
+        if lazy:
+            names = _SnapshotNames(names_part, count, filepath, check_names=validate != 'none')
+            ids = ids_part.cast('q')
+            offsets = offsets_part.cast('Q')
+            grades = grades_part
+        else:
+            names = _decode_names(names_part, count)
+            ids, offsets, grades = array('q'), array('Q'), array('B')
+            ids.frombytes(ids_part)
+            offsets.frombytes(offsets_part)
+            grades.frombytes(grades_part)
+            if sys.byteorder != 'little':
+                ids.byteswap()
+                offsets.byteswap()
+
+        # Границы не убывают и заканчиваются на конце буфера, значит,
+        # каждый срез оценок лежит внутри него
+        if (offsets[0] != 0 or offsets[count] != grades_size
+                or not all(map(le, offsets, islice(offsets, 1, None)))):
+            raise ValueError("некорректные границы оценок")
+
+        if validate != 'none':
+            if count and min(ids) <= 0:
+                raise ValueError("ID должен быть положительным целым числом")
+            if grades_size and max(grades) > 100:
+                raise ValueError("оценка вне диапазона 0-100")
+            if not lazy and not all(name.strip() for name in names):
+                raise ValueError("пустое имя студента")
+
+        instr.add_counts({instr.ROWS_PARSED: count, instr.BYTES_READ: len(buffer)})
+        return StudentTable(ids, names, grades, offsets)
+
+    except (struct.error, ValueError, UnicodeDecodeError, ValidationError) as e:
+        instr.incr(instr.VALIDATION_FAILURES)
+        raise DataSourceError(f"Поврежденный файл снимка {filepath}: {e}")
+
+
+def iter_students(filepath: str, validate: ValidationPolicy = 'strict',
+                  errors: Optional[RejectCollector] = None) -> Iterator[Student]:
+    """
+    Потоково читает студентов, определяя формат файла автоматически:
+    бинарный снимок (отображается в память) или CSV.
+    errors используется только для CSV: снимок проверяется целиком.
+    Журнал изменений файла (<файл>.journal, см. lab.journal), если он
+    есть, применяется к прочитанным студентам.
+    """
+    if is_snapshot(filepath):
+        students = iter(load_snapshot(filepath, lazy=True, validate='none' if validate == 'none' else 'fast'))
+    else:
+        students = iter_students_from_csv(filepath, validate, errors)
+    return iter(_apply_journal(filepath, students))
+
+
+@instr.timed("io.load_students")
+def load_students(filepath: str, validate: ValidationPolicy = 'strict',
+                  with_journal: bool = True) -> List[Student]:
+    """
+    Загружает студентов, определяя формат файла автоматически:
+    бинарный снимок (по магической строке) или CSV.
+    При with_journal=True применяет журнал изменений файла, если он есть.
+    Для снимка создается Student на каждую строку, время линейно
+    по числу студентов; без материализации снимок читают
+    load_snapshot(lazy=True) и iter_students.
+    """
+    if is_snapshot(filepath):
+        students = load_snapshot(filepath, validate='none' if validate == 'none' else 'fast').to_students()
+    else:
+        students = load_students_from_csv(filepath, validate=validate)
+    if with_journal:
+        applied = _apply_journal(filepath, students)
+        if applied is not students:
+            students = list(applied)
+    return students
+
+
+def _apply_journal(filepath: str, students: Iterable[Student]) -> Iterable[Student]:
+    # Журнал построен поверх этого модуля, поэтому импортируется при вызове
+    from lab.journal import apply_journal
+    return apply_journal(filepath, students)
+
+
+@instr.timed("io.save_students")
+def save_students(filepath: str, students: List[Student]):
+    """
+    Сохраняет студентов, выбирая формат автоматически: снимок, если файл
+    имеет расширение .snap или уже является снимком, иначе CSV.
+    """
+    if filepath.endswith(SNAPSHOT_SUFFIX) or is_snapshot(filepath):
+        save_snapshot(filepath, students)
+    else:
+        save_students_to_csv(filepath, students)
@@ -0,0 +1,288 @@
+"""
+Модуль журнала изменений.
+Вместо перезаписи всего файла данных при каждом сохранении изменения
+(добавление, удаление, обновление оценок) дописываются в журнал
+рядом с файлом данных. Периодическое сжатие (compaction) переносит
+накопленные изменения в новый файл данных и очищает журнал.
+Общие загрузчики (io.iter_students, io.load_students) применяют журнал
+сами, поэтому пакетный интерфейс и асинхронные загрузчики видят те же
+данные, что и меню.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import lab.io_utils as io
+from lab.models import Student
+from lab.repository import StudentRepository
+from lab.errors import AppError, DataSourceError
+
+JOURNAL_SUFFIX = '.journal'
+
+# Размер блока при вычислении хеша файла данных
+_HASH_BLOCK = 1 << 20
+
+
+class ChangeJournal:
+    """
+    Журнал изменений в формате JSON Lines, по одной операции в строке:
+    {"op": "add", "id": ..., "name": ..., "grades": [...]},
+    {"op": "remove", "id": ...},
+    {"op": "grades", "id": ..., "grades": [...]}.
+    Новые записи копятся в памяти и попадают на диск при flush(),
+    то есть при сохранении: изменения без сохранения, как и раньше, теряются.
+
+    Первая строка журнала {"op": "base", "sha256": ...} — хеш содержимого
+    файла данных, к которому он относится. Копирование, checkout или touch
+    содержимое не меняют, и журнал продолжает применяться. Если же файл
+    данных изменен в обход журнала, журнал не применяется и не
+    перезаписывается: чтение выбрасывает DataSourceError, и решение
+    (удалить журнал или вернуть прежний файл) остается за пользователем.
+    """
+
+    def __init__(self, data_path: str):
+        self._data_path = data_path
+        self._path = data_path + JOURNAL_SUFFIX
+        self._pending: List[str] = []
+        self._base = _data_digest(data_path)
+        self._entries = self._count_entries()
+
+    @property
+    def data_path(self) -> str:
+        return self._data_path
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def record_add(self, student: Student):
+        self._append({"op": "add", "id": student.id, "name": student.name, "grades": student.grades})
+
+    def record_remove(self, student_id: int):
+        self._append({"op": "remove", "id": student_id})
+
+    def record_grades(self, student_id: int, grades: List[int]):
+        self._append({"op": "grades", "id": student_id, "grades": grades})
+
+    def _append(self, entry: dict):
+        self._pending.append(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._entries += 1
+
+    def flush(self) -> int:
+        """
+        Дописывает накопленные записи в файл журнала одним блоком (с fsync).
+        Время работы пропорционально числу изменений, а не размеру группы.
+        Возвращает количество записанных записей.
+        """
+        if not self._pending:
+            return 0
+        try:
+            if not os.path.exists(self._path) or os.path.getsize(self._path) == 0:
+                # Новый журнал начинается с отметки о файле данных
+                mode, header = 'w', json.dumps({"op": "base", "sha256": self._base}) + "\n"
+            else:
+                mode, header = 'a', ""
+                self._truncate_torn_tail()
+            with open(self._path, mode=mode, encoding='utf-8') as f:
+                f.write(header + "".join(self._pending))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            raise DataSourceError(f"Не удалось записать журнал: {e}")
+        written = len(self._pending)
+        self._pending.clear()
+        return written
+
+    def _truncate_torn_tail(self):
+        """
+        Обрезает оборванную последнюю строку (сбой во время записи),
+        иначе новая запись склеится с ней в поврежденную строку.
+        """
+        with open(self._path, mode='r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                start = max(pos - 4096, 0)
+                f.seek(start)
+                block = f.read(pos - start)
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    pos = start + newline + 1
+                    break
+                pos = start
+            if pos != end:
+                f.truncate(pos)
+
+    def needs_compaction(self, students: StudentRepository) -> bool:
+        """
+        Проверяет, не пора ли перенести журнал в файл данных:
+        записей в журнале не меньше, чем студентов в группе.
+        """
+        return self._entries >= len(students)
+
+    def entries(self) -> Iterator[dict]:
+        """
+        Читает записи журнала. Оборванная последняя строка (сбой во время
+        записи) пропускается, повреждение в середине считается ошибкой.
+        Журнал, не соответствующий содержимому файла данных, — тоже ошибка.
+        """
+        if not os.path.exists(self._path):
+            return
+
+        with open(self._path, mode='r', encoding='utf-8') as f:
+            lines = f.read().split("\n")
+
+        last = len(lines) - 1
+        for line_no, line in enumerate(lines, start=1):
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                if line_no - 1 == last:
+                    return  # Незавершенная запись в конце файла
+                raise DataSourceError(f"Поврежденный журнал {self._path}, строка {line_no}")
+
+            if entry.get("op") == "base":
+                if entry.get("sha256") != self._base:
+                    raise DataSourceError(
+                        f"Журнал {self._path} не соответствует файлу данных {self._data_path}: "
+                        "файл изменен в обход журнала. Удалите журнал, если его изменения "
+                        "не нужны, или верните прежний файл данных."
+                    )
+                continue
+            yield entry
+
+    def _count_entries(self) -> int:
+        try:
+            return sum(1 for _ in self.entries())
+        except OSError as e:
+            raise DataSourceError(f"Ошибка доступа к журналу: {e}")
+
+    def apply(self, students: Iterable[Student]) -> Iterator[Student]:
+        """
+        Потоково применяет записи журнала к студентам из файла данных.
+        Результат тот же, что у тех же операций над StudentRepository:
+        обновленные оценки остаются на месте, удаленные студенты
+        пропускаются, добавленные (в том числе заново) идут в конце
+        в порядке последнего добавления. В памяти — только журнал.
+        """
+        entries = list(self.entries())
+        if not entries:
+            yield from students
+            return
+
+        tail: Dict[int, Tuple[str, List[int]]] = {}  # Добавленные, в порядке добавления
+        vacated: Set[int] = set()                    # Прежнее место в файле освобождено
+        updates: Dict[int, List[int]] = {}           # Новые оценки студентов из файла
+        try:
+            for entry in entries:
+                op, student_id = entry.get("op"), entry.get("id")
+                if op == "add":
+                    vacated.add(student_id)
+                    tail.pop(student_id, None)
+                    tail[student_id] = (entry["name"], entry["grades"])
+                elif op == "remove":
+                    vacated.add(student_id)
+                    tail.pop(student_id, None)
+                elif op == "grades":
+                    if student_id in tail:
+                        tail[student_id] = (tail[student_id][0], entry["grades"])
+                    elif student_id in vacated:
+                        raise DataSourceError(
+                            f"Не удалось применить журнал {self._path}: студент с ID {student_id} не найден.")
+                    else:
+                        updates[student_id] = entry["grades"]
+                else:
+                    raise DataSourceError(f"Неизвестная операция в журнале: {op}")
+
+            seen = set()
+            for s in students:
+                if s.id in updates:
+                    seen.add(s.id)
+                    if s.id not in vacated:
+                        s = Student(s.id, s.name, updates[s.id])
+                if s.id not in vacated:
+                    yield s
+
+            missing = updates.keys() - seen
+            if missing:
+                raise DataSourceError(
+                    f"Не удалось применить журнал {self._path}: студент с ID {min(missing)} не найден.")
+            for student_id, (name, grades) in tail.items():
+                yield Student(student_id, name, grades)
+        except DataSourceError:
+            raise
+        except (AppError, KeyError, TypeError) as e:
+            raise DataSourceError(f"Не удалось применить журнал {self._path}: {e}")
+
+    def compact(self, students: StudentRepository):
+        """
+        Сжатие: атомарно записывает полный файл данных (через временный
+        файл и os.replace) и очищает журнал.
+        """
+        directory, name = os.path.split(self._data_path)
+        # Префикс сохраняет расширение, по которому выбирается формат
+        tmp_path = os.path.join(directory, f".tmp-{name}")
+
+        if self._data_path.endswith(io.SNAPSHOT_SUFFIX) or io.is_snapshot(self._data_path):
+            io.save_snapshot(tmp_path, students)
+        else:
+            io.save_students_to_csv(tmp_path, students)
+
+        try:
+            os.replace(tmp_path, self._data_path)
+            if os.path.exists(self._path):
+                os.remove(self._path)
+        except OSError as e:
+            raise DataSourceError(f"Не удалось сжать журнал: {e}")
+        # Несохраненные записи уже вошли в новый файл данных
+        self._pending.clear()
+        self._entries = 0
+        self._base = _data_digest(self._data_path)
+
+    def __len__(self) -> int:
+        return self._entries
+
+
+def _data_digest(data_path: str) -> Optional[str]:
+    """SHA-256 содержимого файла данных (None, если файла нет)."""
+    digest = hashlib.sha256()
+    try:
+        with open(data_path, mode='rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        raise DataSourceError(f"Ошибка доступа к файлу: {e}")
+    return digest.hexdigest()
+
+
+def apply_journal(data_path: str, students: Iterable[Student]) -> Iterable[Student]:
+    """Применяет журнал файла данных, если он есть (см. ChangeJournal.apply)."""
+    if not os.path.exists(data_path + JOURNAL_SUFFIX):
+        return students
+    return ChangeJournal(data_path).apply(students)
+
+
+def discard_journal(data_path: str):
+    """Удаляет журнал файла данных, который перезаписан целиком."""
+    try:
+        os.remove(data_path + JOURNAL_SUFFIX)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        raise DataSourceError(f"Не удалось удалить журнал: {e}")
+
+
+def load_with_journal(data_path: str) -> StudentRepository:
+    """
+    Загружает файл данных, применяет к нему журнал изменений
+    и возвращает хранилище, которое дописывает новые изменения в журнал.
+    """
+    journal = ChangeJournal(data_path)
+    students = StudentRepository(journal.apply(io.load_students(data_path, with_journal=False)))
+    students.journal = journal
+    return students
@@ -4,13 +4,21 @@
 """
 import sys
 import os
-from typing import List
+from typing import Iterable, List, Optional, Sequence
 
 # Импорты из наших модулей
 from lab.models import Student
 from lab.errors import AppError, StudentNotFoundError
+from lab.repository import StudentRepository
+from lab.journal import discard_journal, load_with_journal
+from lab.distribution import calculate_grade_distribution
 import lab.io_utils as io
 import lab.processing as proc
+from lab import instrumentation as instr
+
+
+# Сколько строк таблицы выводится на одной странице
+PAGE_SIZE = 50
 
 
 # Вспомогательные функции ввода
@@ -46,28 +54,93 @@ def get_grades_input(prompt: str) -> List[int]:
 
 # Обработчики команд меню
 
-def print_table(students: List[Student]):
-    """Выводит список студентов в виде простой таблицы."""
+def _format_rows(students: Sequence[Student], start: int, stop: int) -> List[str]:
+    """Форматирует строки таблицы только для диапазона [start, stop)."""
+    lines = []
+    for i in range(start, stop):
+        s = students[i]
+        grades_str = ", ".join(map(str, s.grades))
+        lines.append(f"{s.id:<5} {s.name:<25} {s.average_grade:<10.2f} [{grades_str}]")
+    return lines
+
+
+def render_page(students: Sequence[Student], page: int, page_size: int = PAGE_SIZE) -> str:
+    """
+    Возвращает одну страницу таблицы одной строкой.
+    Форматируются только студенты видимой страницы.
+    """
+    total = len(students)
+    pages = max(1, -(-total // page_size))
+    page = min(max(page, 0), pages - 1)
+    start = page * page_size
+    stop = min(start + page_size, total)
+
+    lines = [f"{'ID':<5} {'Имя':<25} {'Ср.балл':<10} {'Оценки'}", "-" * 60]
+    lines += _format_rows(students, start, stop)
+    lines.append("-" * 60)
+    if pages > 1:
+        lines.append(f"Страница {page + 1}/{pages} (строки {start + 1}-{stop}), всего: {total}")
+    else:
+        lines.append(f"Всего: {total}")
+    return "\n".join(lines) + "\n"
+
+
+def _find_position(students: Sequence[Student], student_id: int) -> int:
+    """Позиция студента с указанным ID в последовательности или -1."""
+    return next((i for i, s in enumerate(students) if s.id == student_id), -1)
+
+
+def print_table(students: Iterable[Student], page_size: int = PAGE_SIZE):
+    """
+    Выводит список студентов в виде простой таблицы.
+    Каждая страница выводится одним блоком; если студентов больше,
+    чем помещается на страницу, включается постраничный просмотр.
+    """
+    # Последовательность (например, результат сортировки) не копируется
+    if not isinstance(students, Sequence):
+        students = list(students)
+
     if not students:
         print("Список студентов пуст.")
         return
 
-    print(f"{'ID':<5} {'Имя':<25} {'Ср.балл':<10} {'Оценки'}")
-    print("-" * 60)
-    for s in students:
-        grades_str = ", ".join(map(str, s.grades))
-        print(f"{s.id:<5} {s.name:<25} {s.average_grade:<10.2f} [{grades_str}]")
-    print("-" * 60)
-    print(f"Всего: {len(students)}")
+    page = 0
+    pages = -(-len(students) // page_size)
 
+    while True:
+        sys.stdout.write(render_page(students, page, page_size))
+        if pages == 1:
+            return
+
+        command = get_input("[Enter] далее, p — назад, N — страница, #ID — найти, q — выход: ").lower()
+        if command in ('q', 'й'):
+            return
+        elif command in ('', 'n'):
+            if page == pages - 1:
+                return
+            page += 1
+        elif command == 'p':
+            page = max(page - 1, 0)
+        elif command.isdigit():
+            page = min(max(int(command) - 1, 0), pages - 1)
+        elif command.startswith('#') and command[1:].isdigit():
+            position = _find_position(students, int(command[1:]))
+            if position == -1:
+                print(f"Студент с ID {command[1:]} не найден.")
+            else:
+                page = position // page_size
+        else:
+            print("Неизвестная команда.")
 
-def handle_add(students: List[Student]):
+
+@instr.timed("main.handle_add")
+def handle_add(students: StudentRepository):
     print("\n--- Добавление студента ---")
     try:
         new_id = get_int_input("Введите ID: ")
 
-        # Проверка на дубликат ID
-        if any(s.id == new_id for s in students):
+        # Проверка на дубликат ID (по индексу, O(1))
+        if new_id in students:
             print(f"Ошибка: Студент с ID {new_id} уже существует.")
             return
 
@@ -76,51 +149,48 @@ def handle_add(students: List[Student]):
 
         # Создание объекта (тут сработает валидация из models.py)
         new_student = Student(new_id, name, grades)
-        students.append(new_student)
+        students.add(new_student)
         print("Студент успешно добавлен.")
 
     except AppError as e:
         print(f"Ошибка валидации: {e}")
 
 
-def handle_remove(students: List[Student]):
+@instr.timed("main.handle_remove")
+def handle_remove(students: StudentRepository):
     print("\n--- Удаление студента ---")
     target_id = get_int_input("Введите ID для удаления: ")
 
-    # Ищем индекс студента
-    found_idx = -1
-    for i, s in enumerate(students):
-        if s.id == target_id:
-            found_idx = i
-            break
-
-    if found_idx != -1:
-        removed = students.pop(found_idx)
+    try:
+        removed = students.remove(target_id)
         print(f"Студент {removed.name} (ID: {removed.id}) удален.")
-    else:
-        print(f"Ошибка: Студент с ID {target_id} не найден.")
+    except StudentNotFoundError as e:
+        print(f"Ошибка: {e}")
 
 
-def handle_update_grades(students: List[Student]):
+@instr.timed("main.handle_update_grades")
+def handle_update_grades(students: StudentRepository):
     print("\n--- Обновление оценок ---")
     target_id = get_int_input("Введите ID студента: ")
 
-    # Поиск студента
-    student = next((s for s in students if s.id == target_id), None)
+    # Поиск студента по индексу
+    try:
+        student = students.get(target_id)
+    except StudentNotFoundError as e:
+        print(f"Ошибка: {e}")
+        return
 
-    if student:
-        print(f"Текущие оценки для {student.name}: {student.grades}")
-        try:
-            new_grades = get_grades_input("Введите новые оценки (перезапишут старые): ")
-            student.grades = new_grades  # Сеттер выполнит валидацию
-            print("Оценки обновлены.")
-        except AppError as e:
-            print(f"Не удалось обновить: {e}")
-    else:
-        print(f"Ошибка: Студент с ID {target_id} не найден.")
+    print(f"Текущие оценки для {student.name}: {student.grades}")
+    try:
+        new_grades = get_grades_input("Введите новые оценки (перезапишут старые): ")
+        students.update_grades(target_id, new_grades)  # Сеттер выполнит валидацию
+        print("Оценки обновлены.")
+    except AppError as e:
+        print(f"Не удалось обновить: {e}")
 
 
-def handle_stats(students: List[Student]):
+@instr.timed("main.handle_stats")
+def handle_stats(students: Iterable[Student]):
     print("\n--- Статистика группы ---")
     stats = proc.calculate_group_stats(students)
 
@@ -132,14 +202,26 @@ def handle_stats(students: List[Student]):
         print(f"Лучший студент:      {stats.best_student.name} ({stats.best_student.average_grade:.2f})")
         print(f"Худший студент:      {stats.worst_student.name} ({stats.worst_student.average_grade:.2f})")
 
+        dist = calculate_grade_distribution(students)
+        if dist.count:
+            print(f"Медиана оценок:      {dist.median:.2f}")
+            print(f"Квартили (25/75):    {dist.percentile(25):.2f} / {dist.percentile(75):.2f}")
+            print(f"Станд. отклонение:   {dist.std:.2f}")
+            print("Гистограмма оценок:")
+            for low, high, n in dist.histogram():
+                print(f"  {low:>3}-{high:<3} {n:>6}")
+
 
-def handle_top_export(students: List[Student]):
+@instr.timed("main.handle_top_export")
+def handle_top_export(students: StudentRepository):
     print("\n--- Экспорт ТОП-N ---")
     n = get_int_input("Сколько лучших студентов сохранить? ")
     # Если пользователь просто нажал Enter, имя будет "top.csv"
     filename = get_input("Имя файла для экспорта (например, top.csv): ") or "top.csv"
 
-    top_students = proc.get_top_n_students(students, n)
+    # Готовое представление по среднему баллу дает ТОП за O(n).
+    # ТОП прямо из файла, без загрузки: python -m lab.cli export
+    top_students = students.top_n(n)
 
     try:
         io.export_top_students_to_csv(filename, top_students)
@@ -152,8 +234,8 @@ def handle_top_export(students: List[Student]):
 
 def print_menu():
     print("\n=== МЕНЮ УПРАВЛЕНИЯ СТУДЕНТАМИ ===")
-    print("1. Загрузить из CSV")
-    print("2. Сохранить в CSV")
+    print("1. Загрузить из файла (CSV или .snap)")
+    print("2. Сохранить в файл (CSV или .snap)")
     print("3. Показать всех")
     print("4. Добавить студента")
     print("5. Удалить по ID")
@@ -165,8 +247,10 @@ def print_menu():
 
 
 def main():
-    # Состояние приложения (список студентов)
-    current_students: List[Student] = []
+    # Состояние приложения (хранилище студентов с индексом по ID)
+    current_students = StudentRepository()
+    # Текущий порядок вывода и сохранения (None — порядок добавления)
+    sort_key: Optional[str] = None
 
     while True:
         print_menu()
@@ -175,21 +259,40 @@ def main():
         try:
             if choice == '1':
                 path = get_input("Путь к файлу [data/students.csv]: ") or "data/students.csv"
-                current_students = io.load_students_from_csv(path)
+                # Изменения, накопленные в журнале с прошлого сохранения, применяются сразу.
+                # Меню работает с изменяемым хранилищем объектов Student, поэтому и снимок
+                # загружается линейно по числу студентов (~5 с на 1 млн, бенчмарк
+                # load_snapshot_menu); быстрое чтение снимка без материализации — в lab.cli
+                current_students = load_with_journal(path)
+                sort_key = None
                 print('-' * 60)
                 print(f"Загружено {len(current_students)} студентов.")
+                if len(current_students.journal):
+                    print(f"Из журнала применено изменений: {len(current_students.journal)}.")
                 print('-' * 60)
 
             elif choice == '2':
                 path = get_input("Путь для сохранения [data/output.csv]: ") or "data/output.csv"
-                io.save_students_to_csv(path, current_students)
+                journal = current_students.journal
                 print('-' * 60)
-                print("Файл успешно сохранен.")
+                if journal is not None and os.path.abspath(path) == os.path.abspath(journal.data_path):
+                    # Сохранение в исходный файл: дописываем только изменения
+                    if journal.needs_compaction(current_students):
+                        journal.compact(current_students)
+                        print("Журнал изменений перенесен в файл, файл успешно сохранен.")
+                    else:
+                        written = journal.flush()
+                        print(f"Изменения сохранены в журнал ({written} шт.).")
+                else:
+                    io.save_students(path, current_students.sorted_view(sort_key))
+                    # Журнал прежнего содержимого файла к новым данным не относится
+                    discard_journal(path)
+                    print("Файл успешно сохранен.")
                 print('-' * 60)
 
             elif choice == '3':
                 print('-' * 60)
-                print_table(current_students)
+                print_table(current_students.sorted_view(sort_key))
                 print('-' * 60)
 
             elif choice == '4':
@@ -210,12 +313,18 @@ def main():
 
             elif choice == '8':
                 print('-' * 60)
-                print("Критерии: id, name, avg")
+                print("Критерии: id, name, collate (по алфавиту с учетом Ё), avg")
                 key = get_input("Введите критерий сортировки: ")
 
-                current_students = proc.sort_students(current_students, key)
-                print("Список отсортирован.")
-                print_table(current_students)
+                # Отсортированное представление кэшируется в хранилище и
+                # поддерживается при изменениях, повторная сортировка бесплатна
+                if key in proc.SORT_STRATEGIES:
+                    sort_key = key
+                    print("Список отсортирован.")
+                else:
+                    print("Неизвестный критерий сортировки, порядок не изменен.")
+                # Показываем представление напрямую, без копии
+                print_table(current_students.sorted_view(sort_key))
 
             elif choice == '9':
                 print('-' * 60)
@@ -224,6 +333,10 @@ def main():
 
             elif choice == '0':
                 print("Выход из программы.")
+                if instr.is_enabled():
+                    # Профиль (LAB_PROFILE) выводится в stderr, чтобы не смешиваться с меню
+                    instr.take_memory_snapshot("exit")
+                    print(instr.to_json(), file=sys.stderr)
                 break
 
             else:
@@ -238,6 +351,10 @@ def main():
 
 
 if __name__ == "__main__":
+    # С аргументами — пакетный режим (см. lab.cli), без них — интерактивное меню
+    if len(sys.argv) > 1:
+        from lab.cli import run
+        sys.exit(run(sys.argv[1:]))
 
     try:
         main()
@@ -1,14 +1,45 @@
 """
 Модуль с описанием моделей данных.
 """
-from typing import List
+import unicodedata
+from array import array
+from itertools import accumulate, compress, islice
+from operator import not_, sub, truediv
+from typing import Iterable, Iterator, List, Literal, Sequence, Tuple
 from lab.errors import ValidationError
 
+# Политика проверки данных при массовой загрузке:
+# strict — полная проверка в конструкторе Student,
+# fast   — одна проверка диапазона min/max на строку, полная — только при ошибке,
+# none   — без проверки (данные заведомо корректны)
+ValidationPolicy = Literal['strict', 'fast', 'none']
+
+# Ключ сопоставления имени: (основной, вторичный, исходное имя)
+CollationKey = Tuple[str, str, str]
+
+
+def collation_key(name: str) -> CollationKey:
+    """
+    Ключ сортировки имен по правилам русского алфавита.
+    Слова имени сравниваются по очереди (фамилия, затем имя): они
+    склеиваются через '\\0', который меньше любой буквы.
+    Основной ключ — без учета регистра и с Ё, приравненной к Е
+    (в Unicode ё стоит после я, а Ё — перед А); при равенстве слово
+    с Е идет раньше слова с Ё, затем сравнивается исходное написание.
+    """
+    folded = "\0".join(unicodedata.normalize('NFC', name).casefold().split())
+    return folded.replace('ё', 'е'), folded, name
+
+
 class Student:
     """
     Класс, описывающий студента.
+    Использует __slots__ (без __dict__ у экземпляра), а оценки хранит
+    компактным массивом array('B') — они ограничены диапазоном 0-100.
     """
 
+    __slots__ = ('_id', '_name', '_name_key', '_grades', '_grades_sum', '_grades_count')
+
     def __init__(self, student_id: int, name: str, grades: List[int] = None):
         """
         Инициализация студента с валидацией данных.
@@ -22,7 +53,40 @@ class Student:
 
         self._id = student_id
         self._name = name
-        self._grades = grades
+        self._name_key = None
+        self._set_grades(grades)
+
+    @classmethod
+    def from_trusted(cls, student_id: int, name: str, grades: List[int] = None) -> "Student":
+        """
+        Создает студента без валидации.
+        Только для заведомо корректных данных (массовый импорт,
+        уже проверенные колонки StudentTable).
+        """
+        student = cls.__new__(cls)
+        student._id = student_id
+        student._name = name
+        student._name_key = None
+        student._set_grades(grades if grades is not None else [])
+        return student
+
+    @classmethod
+    def from_values(cls, student_id: int, name: str, grades: List[int],
+                    validate: ValidationPolicy = 'strict') -> "Student":
+        """
+        Создает студента из уже разобранных значений согласно политике проверки.
+        Ожидает int в student_id и grades и имя без пробелов по краям.
+        """
+        if validate == 'none':
+            return cls.from_trusted(student_id, name, grades)
+
+        if validate == 'fast' and student_id > 0 and name and (
+                not grades or (min(grades) >= 0 and max(grades) <= 100)):
+            return cls.from_trusted(student_id, name, grades)
+
+        # Строгая проверка (для fast — только если быстрая не прошла,
+        # чтобы сформировать то же сообщение об ошибке)
+        return cls(student_id, name, grades)
 
     @property
     def id(self) -> int:
@@ -32,20 +96,62 @@ class Student:
     def name(self) -> str:
         return self._name
 
+    @property
+    def name_key(self) -> CollationKey:
+        """Ключ сопоставления имени (см. collation_key), вычисляется один раз."""
+        if self._name_key is None:
+            self._name_key = collation_key(self._name)
+        return self._name_key
+
     @property
     def grades(self) -> List[int]:
-        return self._grades
+        # Возвращаем копию: прямое изменение списка сломало бы кэш суммы
+        return self._grades.tolist()
 
     @grades.setter
     def grades(self, new_grades: List[int]):
         self._validate_grades(new_grades)
-        self._grades = new_grades
+        self._set_grades(new_grades)
+
+    @property
+    def grades_sum(self) -> int:
+        return self._grades_sum
+
+    @property
+    def grades_count(self) -> int:
+        return self._grades_count
 
     @property
     def average_grade(self) -> float:
-        if not self._grades:
+        if not self._grades_count:
             return 0.0
-        return sum(self._grades) / len(self._grades)
+        return self._grades_sum / self._grades_count
+
+    def add_grade(self, grade: int):
+        """Добавляет одну оценку, обновляя сумму и количество за O(1)."""
+        self._validate_grade(grade)
+        self._grades.append(grade)
+        self._grades_sum += grade
+        self._grades_count += 1
+
+    def remove_grade(self, grade: int):
+        """Удаляет первое вхождение оценки, обновляя сумму и количество."""
+        try:
+            self._grades.remove(grade)
+        except ValueError:
+            raise ValidationError(f"Оценка {grade} отсутствует у студента.")
+        self._grades_sum -= grade
+        self._grades_count -= 1
+
+    def _set_grades(self, grades: List[int]):
+        """Сохраняет оценки и пересчитывает кэш суммы и количества."""
+        try:
+            self._grades = array('B', grades)
+        except OverflowError:
+            bad = next(g for g in grades if not 0 <= g <= 255)
+            raise ValidationError(f"Оценка должна быть в диапазоне 0-100. Получено: {bad}")
+        self._grades_sum = sum(self._grades)
+        self._grades_count = len(self._grades)
 
     # Методы валидации
 
@@ -61,13 +167,266 @@ class Student:
         if not isinstance(values, list):
             raise ValidationError("Оценки должны быть списком.")
         for grade in values:
-            if not isinstance(grade, int):
-                raise ValidationError(f"Оценка должна быть целым числом. Получено: {grade}")
-            if grade < 0 or grade > 100:
-                raise ValidationError(f"Оценка должна быть в диапазоне 0-100. Получено: {grade}")
+            self._validate_grade(grade)
+
+    def _validate_grade(self, grade: int):
+        if not isinstance(grade, int):
+            raise ValidationError(f"Оценка должна быть целым числом. Получено: {grade}")
+        if grade < 0 or grade > 100:
+            raise ValidationError(f"Оценка должна быть в диапазоне 0-100. Получено: {grade}")
 
     def __str__(self):
         return f"Student(id={self.id}, name='{self.name}', avg={self.average_grade:.2f})"
 
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+
+class StudentTable:
+    """
+    Колоночное представление группы студентов.
+    Вместо списка объектов Student хранит плоские массивы:
+    ids — идентификаторы, names — имена, grades — все оценки подряд,
+    offsets — границы оценок каждого студента (оценки i-го студента
+    лежат в grades[offsets[i]:offsets[i + 1]]).
+    Суммы и средние по строкам хранятся отдельными колонками: при
+    построении из Student берутся готовые, для загруженных колонок
+    считаются один раз (суммы — через префиксные суммы).
+
+    take() возвращает представление: номера строк поверх колонок
+    исходной таблицы. Собственные колонки представления собираются
+    только при первом обращении к ids, names, grades или offsets.
+    """
+
+    def __init__(self, ids: Sequence[int] = None, names: Sequence[str] = None,
+                 grades: Sequence[int] = None, offsets: Sequence[int] = None):
+        """
+        Создает таблицу из готовых колонок (без копирования).
+        """
+        self._ids = ids if ids is not None else array('q')
+        self._names = names if names is not None else []
+        self._grades = grades if grades is not None else array('B')
+        self._offsets = offsets if offsets is not None else array('Q', [0])
+        self._sums = None
+        self._averages = None
+        # Для представления: исходная таблица и номера ее строк
+        self._source = None
+        self._rows = None
+
+        if len(self._names) != len(self._ids) or len(self._offsets) != len(self._ids) + 1:
+            raise ValidationError("Несогласованные размеры колонок таблицы студентов.")
+
+    @classmethod
+    def from_students(cls, students: Iterable[Student]) -> "StudentTable":
+        """Строит таблицу из последовательности объектов Student."""
+        table = cls(array('q'), [], array('B'), array('Q', [0]))
+        table._sums, table._averages = array('Q'), array('d')
+        for s in students:
+            table.append(s)
+        return table
+
+    def to_students(self) -> List[Student]:
+        """
+        Преобразует таблицу обратно в список объектов Student.
+        Оценки берутся срезами буфера, суммы — из колонки sums,
+        без повторной проверки и пересчета (как from_trusted).
+        """
+        self._materialize()
+        grades = self._grades
+        if not isinstance(grades, array):
+            grades = array('B', grades)  # Буфер снимка (memoryview) копируется один раз
+        offsets = self._offsets
+
+        students = []
+        new = Student.__new__
+        for student_id, name, start, end, total in zip(
+                self._ids, self._names, offsets, islice(offsets, 1, None), self.sums):
+            s = new(Student)
+            s._id = student_id
+            s._name = name
+            s._name_key = None
+            s._grades = grades[start:end]
+            s._grades_sum = total
+            s._grades_count = end - start
+            students.append(s)
+        return students
+
+    def append(self, student: Student):
+        """Добавляет студента в конец таблицы."""
+        self._materialize()
+        self._ids.append(student.id)
+        self._names.append(student.name)
+        self._grades.extend(student._grades)
+        self._offsets.append(len(self._grades))
+        # Суммы и средние уже посчитаны в Student — копим их вместе с колонками
+        if self._sums is not None:
+            self._sums.append(student.grades_sum)
+        if self._averages is not None:
+            self._averages.append(student.average_grade)
+
+    @property
+    def ids(self) -> Sequence[int]:
+        self._materialize()
+        return self._ids
+
+    @property
+    def names(self) -> Sequence[str]:
+        self._materialize()
+        return self._names
+
+    @property
+    def grades(self) -> Sequence[int]:
+        self._materialize()
+        return self._grades
+
+    @property
+    def offsets(self) -> Sequence[int]:
+        self._materialize()
+        return self._offsets
+
+    def grades_of(self, index: int) -> List[int]:
+        """Возвращает оценки студента с порядковым номером index."""
+        if self._rows is not None:
+            return self._source.grades_of(self._rows[index])
+        return list(self._grades[self._offsets[index]:self._offsets[index + 1]])
+
+    def student(self, index: int) -> Student:
+        """
+        Материализует одну строку таблицы в объект Student.
+        Колонки уже проверены при заполнении, поэтому валидация пропускается.
+        """
+        if self._rows is not None:
+            return self._source.student(self._rows[index])
+        return Student.from_trusted(self._ids[index], self._names[index], self.grades_of(index))
+
+    @property
+    def sums(self) -> Sequence[int]:
+        """Сумма оценок каждого студента."""
+        if self._sums is None:
+            if self._rows is not None:
+                self._sums = array('Q', map(self._source.sums.__getitem__, self._rows))
+            else:
+                # Префиксные суммы по всему буферу: цикл на C, без срезов по строкам
+                prefix = array('Q', [0])
+                prefix.extend(accumulate(self._grades))
+                ends = map(prefix.__getitem__, islice(self._offsets, 1, None))
+                self._sums = array('Q', map(sub, ends, map(prefix.__getitem__, self._offsets)))
+        return self._sums
+
+    def averages(self) -> array:
+        """
+        Средний балл каждого студента (0.0 без оценок), как Student.average_grade.
+        Считается из колонки sums один раз и кэшируется; результат не изменять.
+        """
+        if self._averages is None:
+            if self._rows is not None:
+                self._averages = array('d', map(self._source.averages().__getitem__, self._rows))
+            else:
+                counts = array('Q', map(sub, islice(self._offsets, 1, None), self._offsets))
+                # У студента без оценок сумма 0: делим на 1 и получаем 0.0
+                for i in compress(range(len(counts)), map(not_, counts)):
+                    counts[i] = 1
+                self._averages = array('d', map(truediv, self.sums, counts))
+        return self._averages
+
+    def take(self, indices: Iterable[int]) -> "StudentTable":
+        """
+        Возвращает таблицу из строк с указанными номерами (в этом порядке).
+        Результат — представление над колонками этой таблицы: сортировка
+        и выборка ТОП-N не копируют оценки.
+        """
+        rows = array('Q', indices)
+        source = self
+        if self._rows is not None:
+            # Представление над представлением ссылается сразу на исходную таблицу
+            source = self._source
+            rows = array('Q', map(self._rows.__getitem__, rows))
+
+        view = StudentTable()
+        view._ids = view._names = view._grades = view._offsets = None
+        view._source, view._rows = source, rows
+        return view
+
+    @classmethod
+    def concat(cls, tables: Iterable["StudentTable"]) -> "StudentTable":
+        """Склеивает таблицы в одну (колонки копируются блоками, без цикла по строкам)."""
+        result = cls.from_students(())
+        for table in tables:
+            table._materialize()
+            base = result._offsets[-1]
+            result._ids.extend(table._ids)
+            result._names.extend(table._names)
+            result._grades.extend(table._grades)
+            result._offsets.extend(map(base.__add__, islice(table._offsets, 1, None)))
+            result._sums.extend(table.sums)
+            result._averages.extend(table.averages())
+        return result
+
+    def __reduce__(self):
+        # Передача между процессами колонками байтов: намного быстрее,
+        # чем сериализация каждого объекта Student
+        self._materialize()
+        names = self._names if isinstance(self._names, list) else list(self._names)
+        columns = (_column_bytes(self._ids, 'q'), names, _column_bytes(self._grades, 'B'),
+                   _column_bytes(self._offsets, 'Q'), _column_bytes(self.sums, 'Q'),
+                   _column_bytes(self.averages(), 'd'))
+        return _table_from_bytes, columns
+
+    def _materialize(self):
+        """
+        Собирает собственные колонки представления: join срезов буфера
+        оценок и map по колонкам, без цикла Python по строкам.
+        """
+        if self._rows is None:
+            return
+        source, rows = self._source, self._rows
+        offsets = source._offsets
+        starts = array('Q', map(offsets.__getitem__, rows))
+        ends = array('Q', map(offsets.__getitem__, map((1).__add__, rows)))
+
+        grades = array('B')
+        grades.frombytes(b"".join(map(source._grades.__getitem__, map(slice, starts, ends))))
+        new_offsets = array('Q', [0])
+        new_offsets.extend(accumulate(map(sub, ends, starts)))
+
+        self._ids = array('q', map(source._ids.__getitem__, rows))
+        self._names = list(map(source._names.__getitem__, rows))
+        self._grades = grades
+        self._offsets = new_offsets
+        self._source = self._rows = None
+
+    def __len__(self) -> int:
+        if self._rows is not None:
+            return len(self._rows)
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Student]:
+        for i in range(len(self)):
+            yield self.student(i)
+
+    def __getitem__(self, index: int) -> Student:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Индекс за пределами таблицы.")
+        return self.student(index)
+
+    def __repr__(self):
+        return f"StudentTable(size={len(self)})"
+
+
+def _column_bytes(column: Sequence, typecode: str) -> bytes:
+    return column.tobytes() if hasattr(column, 'tobytes') else array(typecode, column).tobytes()
+
+
+def _table_from_bytes(ids: bytes, names: List[str], grades: bytes, offsets: bytes,
+                      sums: bytes, averages: bytes) -> StudentTable:
+    """Восстанавливает StudentTable из колонок байтов (см. StudentTable.__reduce__)."""
+    columns = []
+    for typecode, data in (('q', ids), ('B', grades), ('Q', offsets), ('Q', sums), ('d', averages)):
+        column = array(typecode)
+        column.frombytes(data)
+        columns.append(column)
+    table = StudentTable(columns[0], names, columns[1], columns[2])
+    table._sums, table._averages = columns[3], columns[4]
+    return table
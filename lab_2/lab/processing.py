@@ -3,12 +3,17 @@
 Содержит функции для расчета статистики, сортировки и выборки данных.
 Реализован в стиле чистых функций (без побочных эффектов).
 """
+import heapq
+from itertools import compress
 from dataclasses import dataclass
-from typing import List, Optional, Literal
-from lab.models import Student
+from typing import Iterable, List, Optional, Literal, Union
+from lab.models import Student, StudentTable, collation_key
+from lab import instrumentation as instr
 
 # Используем Literal для жесткой типизации стратегий сортировки
-SortStrategy = Literal['id', 'name', 'avg']
+# collate — сортировка имен по правилам алфавита (Ё, регистр, фамилия -> имя)
+SortStrategy = Literal['id', 'name', 'collate', 'avg']
+SORT_STRATEGIES = ('id', 'name', 'collate', 'avg')
 
 @dataclass(frozen=True)
 class GroupStats:
@@ -21,58 +26,223 @@ class GroupStats:
     best_student: Optional[Student]
     worst_student: Optional[Student]
 
-def calculate_group_stats(students: List[Student]) -> GroupStats:
+    def to_dict(self) -> dict:
+        """Представление для машиночитаемого вывода (JSON)."""
+        def student_dict(s: Optional[Student]) -> Optional[dict]:
+            if s is None:
+                return None
+            return {"id": s.id, "name": s.name, "average": round(s.average_grade, 2)}
+
+        return {
+            "count": self.count,
+            "overall_average": round(self.overall_average, 2),
+            "best_student": student_dict(self.best_student),
+            "worst_student": student_dict(self.worst_student),
+        }
+
+@dataclass
+class GroupStatsAccumulator:
+    """
+    Накопитель статистики группы за один проход с O(1) памяти.
+    Частичные результаты (по пачкам, файлам, процессам) объединяются
+    через merge, итог получается через result().
+    """
+    count: int = 0
+    grades_sum: int = 0
+    grades_count: int = 0
+    best_student: Optional[Student] = None
+    worst_student: Optional[Student] = None
+
+    def add(self, student: Student):
+        """Учитывает одного студента."""
+        self.count += 1
+        self.grades_sum += student.grades_sum
+        self.grades_count += student.grades_count
+
+        # Строгие сравнения: при равенстве остается первый встреченный,
+        # как у встроенных max/min
+        avg = student.average_grade
+        if self.best_student is None or avg > self.best_student.average_grade:
+            self.best_student = student
+        if self.worst_student is None or avg < self.worst_student.average_grade:
+            self.worst_student = student
+
+    def update(self, students: Iterable[Student]) -> "GroupStatsAccumulator":
+        """Учитывает всех студентов из итерируемого источника."""
+        for s in students:
+            self.add(s)
+        return self
+
+    def merge(self, other: "GroupStatsAccumulator") -> "GroupStatsAccumulator":
+        """
+        Добавляет к накопителю частичный результат other.
+        other считается идущим после уже учтенных данных.
+        """
+        self.count += other.count
+        self.grades_sum += other.grades_sum
+        self.grades_count += other.grades_count
+
+        if other.best_student is not None and (
+                self.best_student is None
+                or other.best_student.average_grade > self.best_student.average_grade):
+            self.best_student = other.best_student
+        if other.worst_student is not None and (
+                self.worst_student is None
+                or other.worst_student.average_grade < self.worst_student.average_grade):
+            self.worst_student = other.worst_student
+        return self
+
+    def result(self) -> GroupStats:
+        """Возвращает итоговую статистику."""
+        if self.count == 0:
+            return GroupStats(0, 0.0, None, None)
+
+        overall_avg = self.grades_sum / self.grades_count if self.grades_count else 0.0
+        return GroupStats(
+            count=self.count,
+            overall_average=overall_avg,
+            best_student=self.best_student,
+            worst_student=self.worst_student
+        )
+
+@instr.timed("processing.calculate_group_stats")
+def calculate_group_stats(students: Union[Iterable[Student], StudentTable]) -> GroupStats:
     """
     Рассчитывает статистику по группе студентов.
+    Принимает любой итерируемый источник (в том числе поток из CSV)
+    и проходит по нему один раз.
     """
-    if not students:
-        return GroupStats(0, 0.0, None, None)
+    if isinstance(students, StudentTable):
+        if not students:
+            return GroupStats(0, 0.0, None, None)
+        return _calculate_table_stats(students)
 
-    count = len(students)
+    return GroupStatsAccumulator().update(students).result()
 
-    # Сбор всех оценок всех студентов в один плоский список
-    all_grades = [g for s in students for g in s.grades]
+def _rating_key(student: Student):
+    """Ключ рейтинга: по убыванию среднего балла, при равенстве — по имени."""
+    return (-student.average_grade, student.name)
 
-    # Общий средний балл (сумма всех оценок / количество всех оценок)
-    if all_grades:
-        overall_avg = sum(all_grades) / len(all_grades)
-    else:
-        overall_avg = 0.0
+def _table_rating_order(table: StudentTable, indices: List[int]) -> List[int]:
+    """
+    Упорядочивает номера строк таблицы по рейтингу (аналог _rating_key).
+    Две устойчивые сортировки по простым ключам — сначала по имени,
+    затем по убыванию среднего — дают тот же порядок, что сортировка
+    по кортежу, но без создания кортежей и без key-функции на Python
+    (reverse=True сохраняет порядок равных элементов).
+    """
+    indices.sort(key=table.names.__getitem__)
+    indices.sort(key=table.averages().__getitem__, reverse=True)
+    return indices
 
-    # Поиск лучшего и худшего по их личному среднему баллу
-    best_student = max(students, key=lambda s: s.average_grade)
-    worst_student = min(students, key=lambda s: s.average_grade)
+def _calculate_table_stats(table: StudentTable) -> GroupStats:
+    """
+    Статистика по колоночной таблице: все проходы — по массивам
+    sums и averages встроенными функциями, объекты Student создаются
+    только для лучшего и худшего.
+    """
+    count = len(table)
+    grades_count = len(table.grades)
+    overall_avg = sum(table.sums) / grades_count if grades_count else 0.0
+
+    # index возвращает первое вхождение — как строгие сравнения в накопителе
+    averages = table.averages()
+    best_idx = averages.index(max(averages))
+    worst_idx = averages.index(min(averages))
 
     return GroupStats(
         count=count,
         overall_average=overall_avg,
-        best_student=best_student,
-        worst_student=worst_student
+        best_student=table.student(best_idx),
+        worst_student=table.student(worst_idx)
     )
 
-def sort_students(students: List[Student], strategy: SortStrategy) -> List[Student]:
+def _table_order(table: StudentTable, strategy: SortStrategy) -> List[int]:
+    """
+    Возвращает порядок строк таблицы для стратегии сортировки.
+    Сортируются номера строк, объекты Student не создаются.
+    """
+    indices = range(len(table))
+    if strategy == 'id':
+        return sorted(indices, key=table.ids.__getitem__)
+
+    elif strategy == 'name':
+        return sorted(indices, key=table.names.__getitem__)
+
+    elif strategy == 'collate':
+        keys = [collation_key(name) for name in table.names]
+        return sorted(indices, key=keys.__getitem__)
+
+    elif strategy == 'avg':
+        return _table_rating_order(table, list(indices))
+
+    else:
+        return list(indices)
+
+def _table_top_n(table: StudentTable, n: int) -> List[int]:
+    """
+    Номера n лучших строк таблицы. Порог среднего находится кучей
+    по массиву чисел (без ключей), полностью сортируются только
+    строки не хуже порога, включая все равные ему.
+    """
+    averages = table.averages()
+    if n >= len(table):
+        return _table_rating_order(table, list(range(len(table))))
+    threshold = heapq.nlargest(n, averages)[-1]
+    candidates = list(compress(range(len(table)), map(threshold.__le__, averages)))
+    return _table_rating_order(table, candidates)[:n]
+
+@instr.timed("processing.sort_students")
+def sort_students(students: Union[List[Student], StudentTable],
+                  strategy: SortStrategy) -> Union[List[Student], StudentTable]:
     """
     Сортирует список студентов согласно выбранной стратегии.
+    Для StudentTable возвращает отсортированное представление
+    той же таблицы (оценки не копируются).
     """
+    if isinstance(students, StudentTable):
+        return students.take(_table_order(students, strategy))
+
     if strategy == 'id':
         return sorted(students, key=lambda s: s.id)
 
     elif strategy == 'name':
         return sorted(students, key=lambda s: s.name)
 
+    elif strategy == 'collate':
+        # Ключи кэшируются в Student и не пересчитываются при повторных сортировках
+        return sorted(students, key=lambda s: s.name_key)
+
     elif strategy == 'avg':
-        return sorted(students, key=lambda s: (-s.average_grade, s.name))
+        return sorted(students, key=_rating_key)
 
     else:
         # Если передан неизвестный ключ, возвращаем копию без сортировки
         return list(students)
 
-def get_top_n_students(students: List[Student], n: int) -> List[Student]:
+@instr.timed("processing.select_top_n")
+def select_top_n(students: Iterable[Student], n: int) -> List[Student]:
     """
-    Возвращает топ N студентов по среднему баллу
+    Частичная выборка n лучших студентов по среднему баллу.
+    Использует кучу размера n: O(N log n) вместо полной сортировки.
+    Принимает любой итерируемый источник, в том числе поток из CSV,
+    и хранит в памяти не более n студентов.
+    Порядок и разрешение равенств совпадают с sort_students(..., 'avg').
     """
     if n <= 0:
         return []
+    # nsmallest устойчив: при равных ключах сохраняется исходный порядок
+    return heapq.nsmallest(n, students, key=_rating_key)
+
+@instr.timed("processing.get_top_n_students")
+def get_top_n_students(students: Union[Iterable[Student], StudentTable],
+                       n: int) -> Union[List[Student], StudentTable]:
+    """
+    Возвращает топ N студентов по среднему баллу
+    """
+    if isinstance(students, StudentTable):
+        if n <= 0:
+            return students.take([])
+        return students.take(_table_top_n(students, n))
 
-    sorted_list = sort_students(students, 'avg')
-    return sorted_list[:n]
\ No newline at end of file
+    return select_top_n(students, n)
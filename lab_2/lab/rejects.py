@@ -0,0 +1,92 @@
+"""
+Модуль учета отбракованных строк при терпимой (tolerant) загрузке.
+Вместо остановки на первой ошибке загрузчик передает сюда
+номер строки, ее исходный текст и причину и продолжает чтение.
+В памяти хранится ограниченное число записей, все отбракованные
+строки при необходимости пишутся в карантинный CSV.
+"""
+import csv
+from typing import List, NamedTuple, Optional
+from lab.errors import DataSourceError
+
+# Сколько отбракованных строк хранится в памяти по умолчанию
+DEFAULT_KEEP = 1_000
+
+
+class RejectedRow(NamedTuple):
+    """Одна отбракованная строка исходного файла."""
+    line: int       # Номер строки (записи) CSV, как в сообщениях об ошибках
+    raw: str        # Исходный текст строки без перевода строки
+    reason: str     # Текст ошибки разбора или валидации
+
+
+class RejectCollector:
+    """
+    Накопитель отбракованных строк.
+    max_errors — порог: при превышении загрузка прерывается
+    DataSourceError (None — без ограничения).
+    keep — сколько первых записей хранить в памяти для отчета;
+    счетчик count при этом учитывает все.
+    quarantine_path — CSV (line, reason, raw), куда пишутся все
+    отбракованные строки; файл создается сразу и закрывается close().
+    """
+
+    def __init__(self, max_errors: Optional[int] = None, keep: int = DEFAULT_KEEP,
+                 quarantine_path: Optional[str] = None):
+        if max_errors is not None and max_errors < 0:
+            raise ValueError("Порог ошибок не может быть отрицательным.")
+        self.max_errors = max_errors
+        self.keep = keep
+        self.quarantine_path = quarantine_path
+        self.count = 0
+        self.rows: List[RejectedRow] = []
+        self._file = None
+        self._writer = None
+        if quarantine_path is not None:
+            try:
+                self._file = open(quarantine_path, mode='w', encoding='utf-8', newline='')
+            except OSError as e:
+                raise DataSourceError(f"Не удалось создать файл карантина: {e}")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["line", "reason", "raw"])
+
+    def add(self, line: int, raw: str, reason: str):
+        """Учитывает отбракованную строку; при превышении порога выбрасывает DataSourceError."""
+        self.count += 1
+        if len(self.rows) < self.keep:
+            self.rows.append(RejectedRow(line, raw, reason))
+        if self._writer is not None:
+            self._writer.writerow([line, reason, raw])
+
+        if self.max_errors is not None and self.count > self.max_errors:
+            raise DataSourceError(
+                f"Превышен порог ошибок ({self.max_errors}), последняя в строке {line}: {reason}"
+            )
+
+    @property
+    def truncated(self) -> bool:
+        """True, если в памяти сохранены не все отбракованные строки."""
+        return self.count > len(self.rows)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def __enter__(self) -> "RejectCollector":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "truncated": self.truncated,
+            "quarantine": self.quarantine_path,
+            "rows": [row._asdict() for row in self.rows],
+        }
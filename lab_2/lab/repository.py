@@ -0,0 +1,147 @@
+"""
+Модуль хранилища студентов.
+Хранит группу с индексом по ID, чтобы поиск, добавление
+и удаление выполнялись за O(1), а не линейным проходом по списку,
+и кэширует отсортированные представления для стратегий сортировки.
+"""
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional
+from lab.models import Student
+from lab.errors import DuplicateStudentError, StudentNotFoundError
+from lab.processing import SORT_STRATEGIES, SortStrategy, select_top_n
+
+if TYPE_CHECKING:
+    from lab.journal import ChangeJournal
+
+
+class StudentRepository:
+    """
+    Упорядоченная коллекция студентов с индексом id -> Student.
+    Порядок обхода совпадает с порядком добавления.
+    Если подключен журнал, каждое изменение дописывается в него.
+
+    Отсортированные представления (по id, name, collate, avg) строятся лениво
+    при первом запросе и затем поддерживаются при добавлении, удалении
+    и обновлении оценок за O(log N) на поиск позиции, без пересортировки.
+    """
+
+    def __init__(self, students: Iterable[Student] = (), journal: Optional["ChangeJournal"] = None):
+        self._by_id: Dict[int, Student] = {}
+        # Порядковый номер добавления: разрешает равенства так же,
+        # как устойчивая сортировка списка в порядке хранения
+        self._seq: Dict[int, int] = {}
+        self._next_seq = 0
+        self._indexes: Dict[str, List[Student]] = {}
+        self.journal = None
+        for s in students:
+            self.add(s)
+        # Журнал подключается после начального заполнения: загрузка — не изменение
+        self.journal = journal
+
+    def get(self, student_id: int) -> Student:
+        """Возвращает студента по ID или выбрасывает StudentNotFoundError."""
+        try:
+            return self._by_id[student_id]
+        except KeyError:
+            raise StudentNotFoundError(f"Студент с ID {student_id} не найден.")
+
+    def add(self, student: Student):
+        """Добавляет студента. ID должен быть уникальным."""
+        if student.id in self._by_id:
+            raise DuplicateStudentError(f"Студент с ID {student.id} уже существует.")
+        self._by_id[student.id] = student
+        self._seq[student.id] = self._next_seq
+        self._next_seq += 1
+        for strategy, index in self._indexes.items():
+            insort(index, student, key=self._sort_key(strategy))
+        if self.journal is not None:
+            self.journal.record_add(student)
+
+    def remove(self, student_id: int) -> Student:
+        """Удаляет студента по ID и возвращает его."""
+        student = self.get(student_id)
+        for strategy in self._indexes:
+            self._unindex(strategy, student)
+        del self._by_id[student_id]
+        del self._seq[student_id]
+        if self.journal is not None:
+            self.journal.record_remove(student_id)
+        return student
+
+    def update_grades(self, student_id: int, grades: List[int]) -> Student:
+        """Заменяет оценки студента (с валидацией) и возвращает его."""
+        student = self.get(student_id)
+        avg_index = self._indexes.get('avg')
+        if avg_index is not None:
+            # Позиция ищется по старому ключу, до изменения оценок
+            self._unindex('avg', student)
+            try:
+                student.grades = grades
+            finally:
+                insort(avg_index, student, key=self._sort_key('avg'))
+        else:
+            student.grades = grades
+        if self.journal is not None:
+            self.journal.record_grades(student_id, student.grades)
+        return student
+
+    def sorted_view(self, strategy: SortStrategy) -> List[Student]:
+        """
+        Возвращает студентов в порядке стратегии (как sort_students).
+        Представление кэшируется и поддерживается при изменениях,
+        поэтому повторные вызовы бесплатны. Возвращаемый список
+        принадлежит хранилищу и не должен изменяться.
+        Для неизвестной стратегии возвращается порядок хранения.
+        """
+        if strategy not in SORT_STRATEGIES:
+            return self.to_list()
+
+        index = self._indexes.get(strategy)
+        if index is None:
+            index = sorted(self._by_id.values(), key=self._sort_key(strategy))
+            self._indexes[strategy] = index
+        return index
+
+    def top_n(self, n: int) -> List[Student]:
+        """
+        ТОП-N по среднему баллу: O(n) срез, если представление 'avg'
+        уже построено, иначе частичная выборка кучей.
+        """
+        if n <= 0:
+            return []
+        index = self._indexes.get('avg')
+        if index is not None:
+            return index[:n]
+        return select_top_n(self, n)
+
+    def _sort_key(self, strategy: str) -> Callable[[Student], object]:
+        seq = self._seq
+        if strategy == 'id':
+            return lambda s: s.id
+        if strategy == 'name':
+            return lambda s: (s.name, seq[s.id])
+        if strategy == 'collate':
+            return lambda s: (s.name_key, seq[s.id])
+        return lambda s: (-s.average_grade, s.name, seq[s.id])
+
+    def _unindex(self, strategy: str, student: Student):
+        """Удаляет студента из отсортированного представления (поиск бинарный)."""
+        index = self._indexes[strategy]
+        key = self._sort_key(strategy)
+        del index[bisect_left(index, key(student), key=key)]
+
+    def to_list(self) -> List[Student]:
+        """Возвращает студентов списком в порядке хранения."""
+        return list(self._by_id.values())
+
+    def __contains__(self, student_id: int) -> bool:
+        return student_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Student]:
+        return iter(self._by_id.values())
+
+    def __repr__(self):
+        return f"StudentRepository(size={len(self)})"
@@ -1,4 +1,5 @@
 import pytest
+from lab.io_utils import save_students_to_csv
 from lab.models import Student
 
 @pytest.fixture
@@ -8,4 +9,12 @@ def sample_students():
         Student(2, "Bob", [60, 60, 60]),  # Avg: 60.0
         Student(3, "Charlie", [100]),     # Avg: 100.0
         Student(4, "Dave", []),           # Avg: 0.0
-    ]
\ No newline at end of file
+    ]
+
+
+@pytest.fixture
+def group_file(tmp_path, sample_students):
+    """CSV файл группы из sample_students."""
+    path = tmp_path / "group.csv"
+    save_students_to_csv(str(path), sample_students)
+    return path
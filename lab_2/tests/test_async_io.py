@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+import pytest
+from lab.async_io import aload_students, aload_many, asave_students, aexport_top, aiter_student_batches
+from lab.io_utils import load_students_from_csv, save_students_to_csv
+from lab.models import Student
+from lab.errors import DataSourceError
+
+
+def make_students(count):
+    return [Student(i, f"S{i}", [i % 101, 50]) for i in range(1, count + 1)]
+
+
+def test_aload_matches_sync(tmp_path):
+    f = tmp_path / "group.csv"
+    save_students_to_csv(str(f), make_students(250))
+
+    loaded = asyncio.run(aload_students(str(f), batch_size=100))
+
+    assert [(s.id, s.grades) for s in loaded] == [(s.id, s.grades) for s in load_students_from_csv(str(f))]
+
+
+def test_aload_many_keeps_order_and_errors(tmp_path):
+    paths = []
+    for k in range(5):
+        f = tmp_path / f"g{k}.csv"
+        save_students_to_csv(str(f), make_students(k + 1))
+        paths.append(str(f))
+
+    groups = asyncio.run(aload_many(paths, concurrency=2, batch_size=2))
+    assert [len(g) for g in groups] == [1, 2, 3, 4, 5]
+
+    with pytest.raises(DataSourceError):
+        asyncio.run(aload_many(paths + [str(tmp_path / "missing.csv")]))
+
+
+def test_batches_are_bounded(tmp_path):
+    f = tmp_path / "group.csv"
+    save_students_to_csv(str(f), make_students(25))
+
+    async def collect():
+        return [len(b) async for b in aiter_student_batches(str(f), batch_size=10)]
+
+    assert asyncio.run(collect()) == [10, 10, 5]
+
+
+def test_asave_and_export(tmp_path):
+    students = make_students(30)
+    out = tmp_path / "out.csv.gz"
+    top = tmp_path / "top.csv"
+
+    async def run():
+        await asave_students(str(out), iter(students), grades_width=2)
+        return await aexport_top(str(top), str(out), 3)
+
+    assert asyncio.run(run()) == 3
+    assert len(load_students_from_csv(str(out))) == 30
+    assert top.read_text(encoding="utf-8").splitlines()[1] == "30,S30,40.00,30 50"
+
+
+def test_asave_computes_grades_width_off_the_event_loop(tmp_path):
+    threads = []
+
+    class Recorded(list):
+        def __iter__(self):
+            for student in super().__iter__():
+                threads.append(threading.current_thread())
+                yield student
+
+    out = tmp_path / "out.csv"
+    asyncio.run(asave_students(str(out), Recorded([Student(1, "A", [1, 2, 3]), Student(2, "B", [])])))
+
+    assert threads and threading.main_thread() not in threads
+    assert out.read_text(encoding="utf-8").splitlines()[0].count("grade") == 3
+
+
+def test_cancel_save_removes_partial_file(tmp_path):
+    out = tmp_path / "slow.csv"
+
+    def slow_students():
+        for s in make_students(1000):
+            yield s
+            # Медленный источник: запись не успеет закончиться до отмены
+            time.sleep(0.001)
+
+    async def run():
+        task = asyncio.create_task(asave_students(str(out), slow_students(), grades_width=2))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+    assert not out.exists()
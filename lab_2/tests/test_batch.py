@@ -0,0 +1,79 @@
+import json
+from lab.batch import run_groups, find_group_files
+from lab.io_utils import save_students_to_csv, save_snapshot
+from lab.models import Student
+from lab.processing import calculate_group_stats
+
+
+def make_groups(tmp_path):
+    groups_dir = tmp_path / "groups"
+    groups_dir.mkdir()
+    all_students = []
+    for g in range(4):
+        students = [Student(g * 100 + i, f"G{g}S{i}", [(g * 17 + i * 7) % 101, 50]) for i in range(1, 21)]
+        save_students_to_csv(str(groups_dir / f"group{g}.csv"), students)
+        all_students += students
+    return groups_dir, all_students
+
+
+def test_run_groups_parallel_matches_sequential(tmp_path):
+    groups_dir, all_students = make_groups(tmp_path)
+    progress = []
+
+    report = run_groups(str(groups_dir), workers=2, output_dir=str(tmp_path / "out"),
+                        progress=lambda done, total, path: progress.append((done, total)))
+
+    assert [g.path for g in report.groups] == find_group_files(str(groups_dir))
+    assert progress[-1] == (4, 4)
+    # Студенты пришли из других процессов, поэтому сравниваем представления
+    assert report.total.stats.result().to_dict() == calculate_group_stats(all_students).to_dict()
+    assert report.total.distribution.count == 2 * len(all_students)
+
+    sequential = run_groups(str(groups_dir), workers=1, progress=None)
+    assert sequential.to_dict() == report.to_dict()
+
+    saved = json.loads((tmp_path / "out" / "report.json").read_text(encoding="utf-8"))
+    assert saved == report.to_dict()
+    assert (tmp_path / "out" / "group0.csv.stats.json").exists()
+
+
+def test_run_groups_reports_bad_files(tmp_path):
+    groups_dir, _ = make_groups(tmp_path)
+    (groups_dir / "broken.csv").write_text("1,Ivan,abc\n", encoding="utf-8")
+    save_snapshot(str(groups_dir / "extra.snap"), [Student(999, "Snap", [100])])
+
+    report = run_groups(str(groups_dir / "*"), workers=1, progress=None)
+
+    assert [g.path.rsplit("/", 1)[-1] for g in report.failed] == ["broken.csv"]
+    assert "строке 1" in report.failed[0].error
+    assert report.total.stats.result().count == 81
+    assert report.total.stats.result().best_student.name == "Snap"
+
+
+def test_group_reports_with_same_basename_do_not_collide(tmp_path):
+    paths = []
+    for term, grade in (("fall", 60), ("spring", 90)):
+        (tmp_path / "terms" / term).mkdir(parents=True)
+        path = tmp_path / "terms" / term / "group.csv"
+        save_students_to_csv(str(path), [Student(1, term, [grade])])
+        paths.append(str(path))
+
+    out = tmp_path / "out"
+    run_groups(str(tmp_path / "terms" / "*" / "group.csv"), workers=1,
+               output_dir=str(out), progress=None)
+
+    for term, grade in (("fall", 60), ("spring", 90)):
+        saved = json.loads((out / term / "group.csv.stats.json").read_text(encoding="utf-8"))
+        assert saved["file"] == str(tmp_path / "terms" / term / "group.csv")
+        assert saved["overall_average"] == grade
+
+
+def test_non_utf8_group_is_reported_not_fatal(tmp_path):
+    groups_dir, _ = make_groups(tmp_path)
+    (groups_dir / "latin1.csv").write_bytes("1,Jos\xe9,80\n".encode("latin-1"))
+
+    report = run_groups(str(groups_dir), workers=1, progress=None)
+
+    assert [g.path.rsplit("/", 1)[-1] for g in report.failed] == ["latin1.csv"]
+    assert "UTF-8" in report.failed[0].error
+    assert report.total.stats.result().count == 80
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import pytest
+from lab.cli import run
+from lab.io_utils import load_students, is_snapshot
+from lab.journal import load_with_journal
+from lab.models import Student
+
+
+def run_json(capsys, *argv):
+    capsys.readouterr()  # Сбрасываем вывод предыдущих шагов теста
+    assert run([str(a) for a in argv]) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_stats_outputs_json_only(capsys, group_file):
+    result = run_json(capsys, "stats", group_file)
+
+    assert result["count"] == 4
+    assert result["overall_average"] == 75.0
+    assert result["best_student"]["name"] == "Charlie"
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="нужны именованные каналы")
+def test_stats_reads_fifo_once(capsys, group_file, tmp_path):
+    # Как при `python -m lab.cli stats <(cat group.csv)`: канал читается один раз
+    fifo = tmp_path / "group.fifo"
+    os.mkfifo(fifo)
+
+    def feed():
+        with open(fifo, "wb") as f:
+            f.write(group_file.read_bytes())
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    try:
+        assert run_json(capsys, "stats", fifo)["count"] == 4
+    finally:
+        writer.join(timeout=5)
+
+
+def test_top_and_export(capsys, group_file, tmp_path):
+    top = run_json(capsys, "top", group_file, "-n", "2")
+    assert [s["name"] for s in top] == ["Charlie", "Alice"]
+
+    out = tmp_path / "top.csv"
+    assert run_json(capsys, "export", group_file, out, "-n", "3")["count"] == 3
+    assert out.read_text(encoding="utf-8").splitlines()[1] == "3,Charlie,100.00,100"
+
+
+def test_sort_and_convert(capsys, group_file, tmp_path):
+    sorted_file = tmp_path / "sorted.csv"
+    run_json(capsys, "sort", group_file, sorted_file, "--by", "avg")
+    assert [s.name for s in load_students(str(sorted_file))] == ["Charlie", "Alice", "Bob", "Dave"]
+
+    snap = tmp_path / "group.snap"
+    assert run_json(capsys, "convert", group_file, snap)["count"] == 4
+    assert is_snapshot(str(snap))
+
+    back = tmp_path / "back.csv.gz"
+    run_json(capsys, "convert", snap, back)
+    assert [s.grades for s in load_students(str(back))] == [[80, 90], [60, 60, 60], [100], []]
+    assert run_json(capsys, "load", back) == {"file": str(back), "count": 4}
+
+
+def test_error_exit_code(capsys, tmp_path):
+    assert run(["stats", str(tmp_path / "missing.csv")]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert "Файл не найден" in json.loads(captured.err)["error"]
+
+
+def test_stats_without_validation_reports_out_of_range_grade(capsys, tmp_path):
+    f = tmp_path / "bad.csv"
+    f.write_text("1,Ivan,200\n", encoding="utf-8")
+
+    assert run(["--validate", "none", "stats", str(f)]) == 1
+    assert "Получено: 200" in json.loads(capsys.readouterr().err)["error"]
+
+
+def test_stats_includes_distribution(capsys, group_file):
+    dist = run_json(capsys, "stats", group_file)["distribution"]
+
+    assert dist["count"] == 6
+    assert dist["median"] == 70.0
+    assert dist["histogram"][-1] == {"from": 90, "to": 100, "count": 2}
+
+
+def test_groups_command(capsys, group_file, tmp_path):
+    result = run_json(capsys, "groups", group_file, group_file, "-j", "1")
+
+    assert [g["count"] for g in result["groups"]] == [4, 4]
+    assert result["total"]["count"] == 8
+    assert result["failed"] == 0
+
+
+def test_tolerant_mode_reports_rejects(capsys, tmp_path):
+    source = tmp_path / "dirty.csv"
+    source.write_text("1,Alice,80\n2,Bob,-5\n3,Carl,90\n", encoding="utf-8")
+    out = tmp_path / "clean.csv"
+
+    assert run_json(capsys, "--max-errors", "5", "convert", source, out)["count"] == 2
+    assert [s.id for s in load_students(str(out))] == [1, 3]
+
+    capsys.readouterr()
+    assert run(["--max-errors", "0", "load", str(source)]) == 1
+    error, report = map(json.loads, capsys.readouterr().err.strip().splitlines())
+    assert "Превышен порог" in error["error"]
+    assert report["rejected"]["rows"][0]["line"] == 2
+
+
+def test_tolerant_convert_counts_each_bad_row_once(capsys, tmp_path):
+    source = tmp_path / "dirty.csv"
+    source.write_text("1,Alice,80\n2,Bob,-5\n3,Carl,90\n", encoding="utf-8")
+    out = tmp_path / "clean.csv"
+    quarantine = tmp_path / "q.csv"
+
+    capsys.readouterr()
+    assert run(["--max-errors", "1", "--quarantine", str(quarantine), "convert", str(source), str(out)]) == 0
+    captured = capsys.readouterr()
+
+    assert json.loads(captured.out)["count"] == 2
+    assert json.loads(captured.err.strip().splitlines()[-1])["rejected"]["count"] == 1
+    rows = quarantine.read_text(encoding="utf-8").splitlines()
+    assert len(rows) == 2 and rows[1].startswith("2,") and rows[1].endswith('"2,Bob,-5"')
+
+
+def test_commands_see_journaled_changes(capsys, group_file, tmp_path):
+    students = load_with_journal(str(group_file))
+    students.add(Student(5, "Eve", [100]))
+    students.remove(4)
+    students.journal.flush()
+
+    assert run_json(capsys, "load", group_file)["count"] == 4
+    assert run_json(capsys, "stats", group_file)["best_student"]["name"] == "Charlie"
+    assert [s["name"] for s in run_json(capsys, "top", group_file, "-n", "2")] == ["Charlie", "Eve"]
+    assert run_json(capsys, "groups", group_file)["total"]["count"] == 4
+
+
+def test_tolerant_convert_rejects_non_utf8_row(capsys, tmp_path):
+    source = tmp_path / "dirty.csv"
+    source.write_bytes(b"1,Alice,80\n2,\xffBob,70\n3,Carl,90\n")
+    out = tmp_path / "clean.csv"
+
+    assert run_json(capsys, "--max-errors", "10", "convert", source, out)["count"] == 2
+    assert [s.id for s in load_students(str(out))] == [1, 3]
@@ -0,0 +1,51 @@
+import statistics
+import pytest
+from lab.distribution import GradeDistribution, calculate_grade_distribution
+from lab.models import StudentTable
+from lab.errors import ValidationError
+
+
+def test_distribution_matches_statistics(sample_students):
+    grades = [g for s in sample_students for g in s.grades]
+    dist = calculate_grade_distribution(sample_students)
+
+    assert dist.count == 6
+    assert dist.mean == 75.0
+    assert dist.median == statistics.median(grades)
+    assert dist.std == pytest.approx(statistics.pstdev(grades))
+    assert (dist.min, dist.max) == (60, 100)
+    assert dist.percentile(25) == statistics.quantiles(grades, n=4, method="inclusive")[0]
+
+
+def test_percentiles_interpolate_and_bounds():
+    dist = GradeDistribution().update([10, 20, 30, 40])
+
+    assert dist.percentile(0) == 10
+    assert dist.percentile(100) == 40
+    assert dist.percentile(50) == 25.0
+    with pytest.raises(ValueError):
+        dist.percentile(101)
+    assert GradeDistribution().median == 0.0
+
+
+def test_histogram_and_merge(sample_students):
+    left = calculate_grade_distribution(sample_students[:2])
+    right = calculate_grade_distribution(StudentTable.from_students(sample_students[2:]))
+    dist = left.merge(right)
+
+    hist = dist.histogram()
+    assert hist[0] == (0, 9, 0)
+    assert hist[-1] == (90, 100, 2)  # 90 и 100
+    assert len(hist) == 10
+    assert sum(n for _, _, n in hist) == dist.count
+    assert dist.counts[60] == 3
+
+
+def test_out_of_range_grades_raise_validation_error():
+    dist = GradeDistribution().update([50])
+
+    with pytest.raises(ValidationError, match="Получено: 200"):
+        dist.update([60, 200])
+    with pytest.raises(ValidationError, match="Получено: -1"):
+        dist.add(-1)
+    assert dist.counts[50] == 1 and dist.count == 1
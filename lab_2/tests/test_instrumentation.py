@@ -0,0 +1,96 @@
+import json
+import pytest
+from lab import instrumentation as instr
+from lab.cli import run
+from lab.errors import DataSourceError
+from lab.io_utils import iter_students_from_csv, load_students_from_csv
+from lab.processing import calculate_group_stats
+
+
+@pytest.fixture
+def profiling():
+    instr.reset()
+    instr.enable()
+    yield
+    instr.disable()
+    instr.reset()
+
+
+@pytest.fixture
+def group_file(group_file):
+    # Пустая строка в конце проверяет счетчик пропущенных строк
+    with open(group_file, "a", encoding="utf-8") as f:
+        f.write("\n")
+    return group_file
+
+
+def test_disabled_records_nothing(group_file):
+    instr.reset()
+    calculate_group_stats(load_students_from_csv(str(group_file)))
+    assert instr.report() == {"counters": {}, "timers": {}, "memory_snapshots": []}
+
+
+def test_loader_counters_and_phases(profiling, group_file):
+    students = load_students_from_csv(str(group_file))
+    calculate_group_stats(students)
+
+    data = instr.report()
+    assert data["counters"] == {"rows_parsed": 4, "rows_skipped": 2,
+                                "bytes_read": group_file.stat().st_size}
+    assert data["timers"]["io.load_students_from_csv"]["calls"] == 1
+    assert data["timers"]["io.iter_students_from_csv"]["calls"] == 1
+    assert data["timers"]["processing.calculate_group_stats"]["calls"] == 1
+
+
+def test_validation_failure_and_partial_read(profiling, tmp_path, group_file):
+    bad = tmp_path / "bad.csv"
+    bad.write_text("1,Alice,80\n2,Bob,200\n", encoding="utf-8")
+    with pytest.raises(DataSourceError):
+        load_students_from_csv(str(bad))
+
+    # Досрочно закрытый поток: время учтено, байты — нет
+    stream = iter_students_from_csv(str(group_file))
+    next(stream)
+    stream.close()
+
+    data = instr.report()
+    assert data["counters"] == {"rows_parsed": 2, "rows_skipped": 1, "validation_failures": 1}
+    assert data["timers"]["io.iter_students_from_csv"]["calls"] == 2
+
+
+def test_prometheus_and_memory(group_file):
+    instr.reset()
+    instr.enable(trace_memory=True)
+    try:
+        load_students_from_csv(str(group_file))
+        snapshot = instr.take_memory_snapshot("after-load")
+        text = instr.to_prometheus()
+    finally:
+        instr.disable()
+        instr.reset()
+
+    assert snapshot["label"] == "after-load" and snapshot["peak"] >= snapshot["current"]
+    assert "# TYPE lab_rows_parsed_total counter\nlab_rows_parsed_total 4" in text
+    assert 'lab_phase_seconds_count{phase="io.load_students_from_csv"} 1' in text
+    assert 'lab_phase_peak_alloc_bytes{phase="io.load_students_from_csv"}' in text
+
+
+def test_env_switch():
+    instr.enable_from_env({"LAB_PROFILE": "0"})
+    assert not instr.is_enabled()
+    instr.enable_from_env({"LAB_PROFILE": "1"})
+    assert instr.is_enabled()
+    instr.disable()
+
+
+def test_cli_profile_goes_to_stderr(capsys, group_file):
+    try:
+        assert run(["--profile", "stats", str(group_file)]) == 0
+    finally:
+        instr.disable()
+        instr.reset()
+    captured = capsys.readouterr()
+
+    assert json.loads(captured.out)["count"] == 4
+    profile = json.loads(captured.err.strip().splitlines()[-1])
+    assert profile["counters"]["rows_parsed"] == 4
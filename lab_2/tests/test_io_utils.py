@@ -1,6 +1,24 @@
+import gzip
+import lzma
+from array import array
 import pytest
-from lab.io_utils import save_students_to_csv, load_students_from_csv
+from lab.io_utils import (
+    save_students_to_csv,
+    load_students_from_csv,
+    iter_students_from_csv,
+    iter_student_batches,
+    load_students_parallel,
+    save_snapshot,
+    load_snapshot,
+    is_snapshot,
+    load_students,
+    save_students,
+    write_students_csv,
+    export_top_students_to_csv,
+)
 from lab.errors import DataSourceError
+from lab.rejects import RejectCollector
+from lab.models import Student, StudentTable
 
 
 def test_roundtrip_csv(tmp_path, sample_students):
@@ -33,4 +51,316 @@ def test_load_bad_format(tmp_path):
     f.write_text("id,name,grade1\n1,Ivan,abc")
 
     with pytest.raises(DataSourceError):
-        load_students_from_csv(str(f))
\ No newline at end of file
+        load_students_from_csv(str(f))
+
+def test_iter_students_streaming(tmp_path):
+    f = tmp_path / "stream.csv"
+    f.write_text("id,name,grade1\n1,Ivan,50\n\n2,Petr,70\n", encoding="utf-8")
+
+    students = iter_students_from_csv(str(f))
+
+    # Генератор, а не готовый список
+    assert not isinstance(students, list)
+    assert [s.name for s in students] == ["Ivan", "Petr"]
+
+
+def test_iter_student_batches(tmp_path):
+    f = tmp_path / "batches.csv"
+    f.write_text("".join(f"{i},Student{i},{i}\n" for i in range(1, 8)), encoding="utf-8")
+
+    batches = list(iter_student_batches(str(f), batch_size=3))
+
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert batches[-1][0].id == 7
+
+
+def test_iter_reports_line_number(tmp_path):
+    f = tmp_path / "bad_line.csv"
+    f.write_text("id,name\n1,Ivan,50\n2,Petr,oops\n", encoding="utf-8")
+
+    students = iter_students_from_csv(str(f))
+    assert next(students).name == "Ivan"
+    with pytest.raises(DataSourceError, match="строке 3"):
+        next(students)
+
+
+def _write_roster(path, count):
+    lines = ["id,name,grade1,grade2"]
+    lines += [f"{i},Студент {i},{i % 101},{(i * 7) % 101}" for i in range(1, count + 1)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_parallel_matches_sequential(tmp_path):
+    f = tmp_path / "big.csv"
+    _write_roster(f, 500)
+
+    expected = load_students_from_csv(str(f))
+    loaded = load_students_parallel(str(f), workers=2, chunk_size=1024)
+
+    assert [(s.id, s.name, s.grades) for s in loaded] == \
+        [(s.id, s.name, s.grades) for s in expected]
+
+
+def test_parallel_global_line_numbers(tmp_path, capsys):
+    f = tmp_path / "bad.csv"
+    _write_roster(f, 300)
+    with open(f, "a", encoding="utf-8") as out:
+        out.write("id,name\n999,Bad,abc\n")
+
+    # Строка 1 — заголовок, затем 300 студентов, повторный заголовок в 302
+    with pytest.raises(DataSourceError, match="строке 303"):
+        load_students_parallel(str(f), workers=2, chunk_size=512)
+    assert "Skipping header at line 302" in capsys.readouterr().out
+
+
+def test_parallel_shards(tmp_path):
+    shards = []
+    for k in range(3):
+        shard = tmp_path / f"shard{k}.csv"
+        _write_roster(shard, 10)
+        shards.append(str(shard))
+
+    loaded = load_students_parallel(shards, workers=2)
+    assert len(loaded) == 30
+
+    with pytest.raises(DataSourceError, match="Файл не найден"):
+        load_students_parallel(shards + [str(tmp_path / "missing.csv")])
+
+
+def test_parallel_quoted_newline_across_chunks_matches_sequential(tmp_path):
+    f = tmp_path / "quoted.csv"
+    lines = [f"{i},S{i},{i % 101}" for i in range(1, 200)]
+    lines[60] = '61,"Multi\nline, name",70'
+    f.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    expected = [(s.id, s.name, s.grades) for s in load_students_from_csv(str(f))]
+    assert expected[60] == (61, "Multi\nline, name", [70])
+    # Перебор размеров: часть границ попадает внутрь поля в кавычках
+    for chunk_size in range(16, 1200, 13):
+        loaded = load_students_parallel(str(f), workers=1, chunk_size=chunk_size)
+        assert [(s.id, s.name, s.grades) for s in loaded] == expected
+
+
+def test_parallel_non_utf8_row_is_data_source_error(tmp_path):
+    f = tmp_path / "bad.csv"
+    _write_roster(f, 50)
+    with open(f, "ab") as out:
+        out.write(b"51,\xffBad,10\n")
+
+    with pytest.raises(DataSourceError, match="строке 52: .*UTF-8"):
+        load_students_parallel(str(f), workers=1, chunk_size=256)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_snapshot_roundtrip(tmp_path, sample_students, lazy):
+    f = tmp_path / "group.snap"
+    save_snapshot(str(f), sample_students)
+
+    assert is_snapshot(str(f))
+    table = load_snapshot(str(f), lazy=lazy)
+
+    assert list(table.ids) == [s.id for s in sample_students]
+    assert [s.grades for s in table] == [s.grades for s in sample_students]
+    assert table[1].name == "Bob"
+
+
+def test_snapshot_unicode_and_empty(tmp_path):
+    f = tmp_path / "ru.snap"
+    save_snapshot(str(f), [Student(7, "Ёлкина Алёна", [100, 0])])
+    assert load_snapshot(str(f), lazy=True)[0].name == "Ёлкина Алёна"
+
+    empty = tmp_path / "empty.snap"
+    save_snapshot(str(empty), [])
+    assert len(load_snapshot(str(empty))) == 0
+
+
+def test_snapshot_corrupted(tmp_path, sample_students):
+    f = tmp_path / "broken.snap"
+    save_snapshot(str(f), sample_students)
+    f.write_bytes(f.read_bytes()[:40])
+
+    with pytest.raises(DataSourceError, match="Поврежденный"):
+        load_snapshot(str(f))
+
+
+def test_load_and_save_detect_format(tmp_path, sample_students):
+    snap = tmp_path / "data.snap"
+    csv_file = tmp_path / "data.csv"
+
+    save_students(str(snap), sample_students)
+    save_students(str(csv_file), sample_students)
+
+    assert is_snapshot(str(snap))
+    assert not is_snapshot(str(csv_file))
+    assert [s.grades for s in load_students(str(snap))] == \
+        [s.grades for s in load_students(str(csv_file))]
+
+
+def test_fast_validation_same_result_and_errors(tmp_path):
+    good = tmp_path / "good.csv"
+    _write_roster(good, 50)
+    strict = load_students_from_csv(str(good))
+    fast = load_students_from_csv(str(good), validate="fast")
+    assert [(s.id, s.name, s.grades) for s in fast] == [(s.id, s.name, s.grades) for s in strict]
+
+    bad = tmp_path / "bad.csv"
+    bad.write_text("1,Ivan,50\n2,Petr,150\n", encoding="utf-8")
+    with pytest.raises(DataSourceError) as strict_error:
+        load_students_from_csv(str(bad))
+    with pytest.raises(DataSourceError) as fast_error:
+        load_students_from_csv(str(bad), validate="fast")
+    assert str(fast_error.value) == str(strict_error.value)
+
+
+def test_snapshot_rejects_out_of_range_grades(tmp_path):
+    f = tmp_path / "trusted.snap"
+    save_snapshot(str(f), [Student.from_trusted(1, "Ivan", [200])])
+
+    with pytest.raises(DataSourceError, match="0-100"):
+        load_snapshot(str(f))
+    assert load_snapshot(str(f), validate="none").grades_of(0) == [200]
+
+
+def _read_text(path):
+    opener = {".gz": gzip.open, ".xz": lzma.open}.get(path.suffix, open)
+    with opener(path, "rt", encoding="utf-8") as fh:
+        return fh.read()
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".csv.gz", ".csv.xz"])
+def test_streaming_write_roundtrip(tmp_path, sample_students, suffix):
+    f = tmp_path / f"stream{suffix}"
+
+    # Одноразовый итератор: ширина заголовка объявляется заранее
+    write_students_csv(str(f), iter(sample_students), grades_width=3)
+    loaded = load_students_from_csv(str(f))
+
+    assert [s.grades for s in loaded] == [s.grades for s in sample_students]
+    assert _read_text(f).splitlines()[0] == "id,name,grade1,grade2,grade3"
+
+
+def test_streaming_write_width_rules(tmp_path, sample_students):
+    f = tmp_path / "out.csv"
+
+    with pytest.raises(ValueError, match="grades_width"):
+        write_students_csv(str(f), iter(sample_students))
+    with pytest.raises(DataSourceError, match="ID 2"):
+        write_students_csv(str(f), sample_students, grades_width=2)
+
+    # Для последовательности ширина находится первым проходом
+    write_students_csv(str(f), sample_students)
+    assert f.read_text(encoding="utf-8").splitlines()[0] == "id,name,grade1,grade2,grade3"
+
+    save_students_to_csv(str(f), [])
+    assert f.read_text(encoding="utf-8").strip() == "id,name"
+
+
+def test_export_top_from_stream(tmp_path, sample_students):
+    f = tmp_path / "top.csv.gz"
+    export_top_students_to_csv(str(f), (s for s in sample_students if s.grades))
+
+    lines = _read_text(f).splitlines()
+    assert lines[0] == "id,name,average,grades_str"
+    assert lines[1] == "1,Alice,85.00,80 90"
+    assert len(lines) == 4
+
+
+def test_tolerant_load_collects_bad_rows(tmp_path, capsys):
+    path = tmp_path / "dirty.csv"
+    path.write_text(
+        'id,name,g1\n1,Alice,80\n2,Bob,200\nx2\n3,"Carl, Jr",abc\n4,Dave,70\n',
+        encoding="utf-8",
+    )
+    quarantine = tmp_path / "bad.csv"
+
+    with RejectCollector(quarantine_path=str(quarantine)) as errors:
+        students = load_students_from_csv(str(path), errors=errors)
+
+    assert [s.id for s in students] == [1, 4]
+    assert [(r.line, r.raw) for r in errors.rows] == [(3, "2,Bob,200"), (5, '3,"Carl, Jr",abc')]
+    assert errors.count == 2
+    assert "invalid literal" in errors.rows[1].reason
+    # Карантин читается как обычный CSV и хранит исходный текст строк
+    assert quarantine.read_text(encoding="utf-8").splitlines()[1].startswith("3,")
+    # Строка "x2" — не ошибка, а заголовок: поведение совпадает со строгим режимом
+    assert "Skipping header at line 4" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("name", ["dirty.csv", "dirty.csv.gz"])
+def test_non_utf8_row_is_rejected_or_reported(tmp_path, name):
+    path = tmp_path / name
+    data = "1,Анна,80\n".encode("utf-8") + b"2,\xff\xfeBob,70\n" + b"3,Carl,90\n"
+    path.write_bytes(gzip.compress(data) if name.endswith(".gz") else data)
+    quarantine = tmp_path / "bad.csv"
+
+    with RejectCollector(quarantine_path=str(quarantine)) as errors:
+        students = load_students_from_csv(str(path), errors=errors)
+
+    assert [s.id for s in students] == [1, 3]
+    assert [(r.line, r.raw) for r in errors.rows] == [(2, "2,\ufffd\ufffdBob,70")]
+    assert "UTF-8" in errors.rows[0].reason
+    assert quarantine.read_text(encoding="utf-8").splitlines()[1].startswith("2,")
+
+    with pytest.raises(DataSourceError, match="Ошибка в строке 2: .*UTF-8"):
+        load_students_from_csv(str(path))
+
+
+def test_tolerant_load_threshold_and_bounded_report(tmp_path):
+    path = tmp_path / "dirty.csv"
+    path.write_text("".join(f"{i},S{i},{'bad' if i % 2 else 50}\n" for i in range(1, 11)), encoding="utf-8")
+
+    errors = RejectCollector(keep=2)
+    assert len(load_students_from_csv(str(path), errors=errors)) == 5
+    assert errors.count == 5 and len(errors.rows) == 2 and errors.truncated
+
+    with pytest.raises(DataSourceError, match=r"Превышен порог ошибок \(2\), последняя в строке 5"):
+        load_students_from_csv(str(path), errors=RejectCollector(max_errors=2))
+
+
+def test_snapshot_lazy_names_decoded_on_access(tmp_path):
+    f = tmp_path / "lazy.snap"
+    save_snapshot(str(f), [Student(1, "Ёлкина Алёна", [5]), Student(2, "Bob", [])])
+    table = load_snapshot(str(f), lazy=True)
+
+    assert not isinstance(table.names, list)
+    assert table.names[-1] == "Bob"
+    assert list(table.names) == ["Ёлкина Алёна", "Bob"]
+    assert [s.name for s in table.to_students()] == ["Ёлкина Алёна", "Bob"]
+
+
+def test_snapshot_lazy_names_report_corruption_on_access(tmp_path):
+    f = tmp_path / "names.snap"
+    save_snapshot(str(f), [Student(1, "Ann", [5])])
+    data = bytearray(f.read_bytes())
+    data[data.index(b"Ann")] = 0xFF
+    f.write_bytes(bytes(data))
+
+    table = load_snapshot(str(f), lazy=True)
+    with pytest.raises(DataSourceError, match="Поврежденный"):
+        table.names[0]
+
+
+@pytest.mark.parametrize("offsets", [[0, 5, 2, 6], [0, 9, 9, 6]])
+def test_snapshot_rejects_bad_middle_offsets(tmp_path, offsets):
+    f = tmp_path / "offsets.snap"
+    table = StudentTable(array("q", [1, 2, 3]), ["A", "B", "C"], array("B", [1, 2, 3, 4, 5, 6]),
+                         array("Q", offsets))
+    save_snapshot(str(f), table)
+
+    for lazy in (False, True):
+        with pytest.raises(DataSourceError, match="границы оценок"):
+            load_snapshot(str(f), lazy=lazy)
+    with pytest.raises(DataSourceError, match="границы оценок"):
+        load_students(str(f))
+
+
+@pytest.mark.parametrize("name", [" ", "　 ", "\xa0"])
+def test_snapshot_whitespace_name_rejected_in_both_modes(tmp_path, name):
+    f = tmp_path / "names.snap"
+    save_snapshot(str(f), [Student(1, "Ann", [5]), Student.from_trusted(2, name, [])])
+
+    with pytest.raises(DataSourceError, match="пустое имя"):
+        load_snapshot(str(f))
+    with pytest.raises(DataSourceError, match="пустое имя"):
+        load_snapshot(str(f), lazy=True).names[0]
+    assert load_snapshot(str(f), lazy=True, validate="none").names[1] == name
@@ -0,0 +1,166 @@
+import os
+import shutil
+import pytest
+from lab.io_utils import (
+    save_students_to_csv, load_students_from_csv, save_snapshot, load_snapshot,
+    load_students, iter_students, iter_student_batches,
+)
+from lab.journal import JOURNAL_SUFFIX, ChangeJournal, discard_journal, load_with_journal
+from lab.models import Student
+from lab.errors import DataSourceError
+
+
+def test_changes_go_to_journal_not_data_file(group_file):
+    original = group_file.read_text(encoding="utf-8")
+    students = load_with_journal(str(group_file))
+
+    students.add(Student(5, "Eve", [70]))
+    students.update_grades(1, [100])
+    students.remove(2)
+    assert students.journal.flush() == 3
+
+    # Файл данных не переписывается, изменения — только в журнале
+    assert group_file.read_text(encoding="utf-8") == original
+
+    reloaded = load_with_journal(str(group_file))
+    assert [s.id for s in reloaded] == [1, 3, 4, 5]
+    assert reloaded.get(1).grades == [100]
+    assert len(reloaded.journal) == 3
+
+
+def test_unsaved_changes_are_not_persisted(group_file):
+    students = load_with_journal(str(group_file))
+    students.remove(1)
+
+    assert 1 in load_with_journal(str(group_file))
+
+
+def test_compaction_rewrites_data_and_refuses_leftover_journal(group_file):
+    students = load_with_journal(str(group_file))
+    students.add(Student(5, "Eve", [70]))
+    students.remove(5)
+    students.add(Student(5, "Eve", [90]))
+    journal = students.journal
+    journal.flush()
+    old_log = open(journal.path, encoding="utf-8").read()
+
+    journal.compact(students)
+    assert len(journal) == 0
+    assert [(s.id, s.grades) for s in load_students_from_csv(str(group_file))] == \
+        [(1, [80, 90]), (2, [60, 60, 60]), (3, [100]), (4, []), (5, [90])]
+
+    # Журнал, оставшийся от данных до сжатия (сбой между заменой файла
+    # и удалением журнала), не применяется повторно
+    with open(journal.path, "w", encoding="utf-8") as f:
+        f.write(old_log)
+    with pytest.raises(DataSourceError, match="не соответствует"):
+        load_with_journal(str(group_file))
+
+
+def test_compaction_keeps_snapshot_format(tmp_path, sample_students):
+    path = tmp_path / "group.snap"
+    save_snapshot(str(path), sample_students)
+
+    students = load_with_journal(str(path))
+    students.update_grades(4, [50])
+    students.journal.compact(students)
+
+    assert load_snapshot(str(path)).grades_of(3) == [50]
+
+
+def test_truncated_tail_is_ignored_but_corruption_is_not(group_file):
+    journal = ChangeJournal(str(group_file))
+    with open(journal.path, "w", encoding="utf-8") as f:
+        f.write('{"op": "remove", "id": 1}\n{"op": "rem')
+    assert [s.id for s in load_with_journal(str(group_file))] == [2, 3, 4]
+
+    with open(journal.path, "w", encoding="utf-8") as f:
+        f.write('garbage\n{"op": "remove", "id": 1}\n')
+    with pytest.raises(DataSourceError, match="строка 1"):
+        load_with_journal(str(group_file))
+
+
+def test_journal_of_changed_data_file_is_refused(tmp_path, group_file):
+    students = load_with_journal(str(group_file))
+    students.update_grades(1, [100])
+    students.journal.flush()
+    journal_text = open(students.journal.path, encoding="utf-8").read()
+
+    # Файл данных перезаписан в обход журнала: журнал не применяется и не затирается
+    save_students_to_csv(str(group_file), [Student(10, "Zed", [40])])
+    with pytest.raises(DataSourceError, match="не соответствует"):
+        load_with_journal(str(group_file))
+    with pytest.raises(DataSourceError, match="не соответствует"):
+        load_students(str(group_file))
+    assert open(students.journal.path, encoding="utf-8").read() == journal_text
+
+    discard_journal(str(group_file))
+    assert [s.id for s in load_with_journal(str(group_file))] == [10]
+
+
+def test_journal_survives_copy_and_touch(tmp_path, group_file):
+    students = load_with_journal(str(group_file))
+    students.add(Student(5, "Eve", [70]))
+    students.update_grades(1, [100])
+    students.journal.flush()
+
+    copy_dir = tmp_path / "copy"
+    copy_dir.mkdir()
+    for name in (group_file.name, group_file.name + JOURNAL_SUFFIX):
+        shutil.copyfile(group_file.parent / name, copy_dir / name)
+    copied = copy_dir / group_file.name
+    os.utime(copied, ns=(1, 1))
+
+    reloaded = load_with_journal(str(copied))
+    assert [(s.id, s.grades) for s in reloaded][-2:] == [(4, []), (5, [70])]
+    assert reloaded.get(1).grades == [100]
+    assert len(reloaded.journal) == 2
+
+
+def test_small_group_is_compacted_once_journal_is_as_long(group_file):
+    students = load_with_journal(str(group_file))
+    for grade in (10, 20, 30):
+        students.update_grades(1, [grade])
+    assert not students.journal.needs_compaction(students)
+
+    students.update_grades(1, [40])
+    assert students.journal.needs_compaction(students)
+
+
+def test_readers_apply_journal(group_file):
+    students = load_with_journal(str(group_file))
+    students.remove(2)
+    students.update_grades(3, [50])
+    students.add(Student(2, "Bob", [99]))
+    students.journal.flush()
+    expected = [(s.id, s.grades) for s in students]
+
+    assert [(s.id, s.grades) for s in load_students(str(group_file))] == expected
+    assert [(s.id, s.grades) for s in iter_students(str(group_file))] == expected
+    assert [(s.id, s.grades) for batch in iter_student_batches(str(group_file), 2) for s in batch] == expected
+    assert [(s.id, s.grades) for s in load_students(str(group_file), with_journal=False)] == \
+        [(1, [80, 90]), (2, [60, 60, 60]), (3, [100]), (4, [])]
+
+
+def test_journal_update_of_missing_student_is_an_error(group_file):
+    journal = ChangeJournal(str(group_file))
+    journal.record_remove(1)
+    journal.record_grades(1, [10])
+    journal.flush()
+
+    with pytest.raises(DataSourceError, match="ID 1 не найден"):
+        load_students(str(group_file))
+
+
+def test_flush_after_torn_tail_keeps_journal_readable(group_file):
+    students = load_with_journal(str(group_file))
+    students.remove(1)
+    students.journal.flush()
+    with open(students.journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "rem')
+
+    students = load_with_journal(str(group_file))
+    students.remove(2)
+    students.journal.flush()
+
+    assert [s.id for s in load_with_journal(str(group_file))] == [3, 4]
@@ -1,6 +1,7 @@
 from io import StringIO
 import pytest
-from lab.main import main
+from lab.main import main, print_table, render_page
+from lab.models import Student
 
 
 def test_cli_add_student_flow(monkeypatch, capsys):
@@ -31,4 +32,105 @@ def test_cli_add_student_flow(monkeypatch, capsys):
     captured = capsys.readouterr()
 
     assert "Студент успешно добавлен" in captured.out
-    assert "Выход из программы" in captured.out
\ No newline at end of file
+    assert "Выход из программы" in captured.out
+
+def test_cli_top_export(monkeypatch, capsys, tmp_path):
+    target = tmp_path / "top.csv"
+
+    inputs = iter([
+        "4", "1", "A", "50",
+        "4", "2", "B", "90",
+        "4", "3", "C", "70",
+        "9", "2", str(target),  # Те же вопросы, что и раньше: N и имя файла
+        "0"
+    ])
+    monkeypatch.setattr('builtins.input', lambda msg="": next(inputs))
+
+    main()
+
+    captured = capsys.readouterr()
+    assert "Успешно сохранено 2 записей" in captured.out
+    lines = target.read_text(encoding="utf-8").splitlines()
+    assert lines[1].startswith("2,B,90.00")
+    assert lines[2].startswith("3,C,70.00")
+
+
+def test_cli_remove_and_update_missing(monkeypatch, capsys):
+    inputs = iter([
+        "4", "1", "Ivan", "50",  # Добавить студента
+        "6", "1", "90 100",      # Обновить оценки
+        "5", "2",                # Удалить несуществующего
+        "5", "1",                # Удалить существующего
+        "6", "1",                # Обновить уже удаленного
+        "0"
+    ])
+    monkeypatch.setattr('builtins.input', lambda msg="": next(inputs))
+
+    main()
+
+    out = capsys.readouterr().out
+    assert "Оценки обновлены" in out
+    assert "Ошибка: Студент с ID 2 не найден." in out
+    assert "Студент Ivan (ID: 1) удален." in out
+    assert "Ошибка: Студент с ID 1 не найден." in out
+
+
+def test_cli_unknown_sort_key_keeps_order(monkeypatch, capsys):
+    inputs = iter([
+        "4", "1", "Bob", "50",
+        "4", "2", "Alice", "60",
+        "8", "name",
+        "8", "grade",  # Неизвестный критерий
+        "0"
+    ])
+    monkeypatch.setattr('builtins.input', lambda msg="": next(inputs))
+
+    main()
+
+    out = capsys.readouterr().out
+    assert "Неизвестный критерий сортировки, порядок не изменен." in out
+    last_table = out.rsplit("порядок не изменен.", 1)[1]
+    assert last_table.index("Alice") < last_table.index("Bob")
+
+
+def test_cli_save_to_loaded_file_appends_journal(monkeypatch, capsys, tmp_path):
+    data = tmp_path / "group.csv"
+    data.write_text("id,name,grade1\n1,Ivan,50\n", encoding="utf-8")
+
+    inputs = iter([
+        "1", str(data),
+        "4", "2", "Petr", "70",
+        "2", str(data),
+        "0"
+    ])
+    monkeypatch.setattr('builtins.input', lambda msg="": next(inputs))
+
+    main()
+
+    out = capsys.readouterr().out
+    assert "Изменения сохранены в журнал (1 шт.)" in out
+    assert data.read_text(encoding="utf-8") == "id,name,grade1\n1,Ivan,50\n"
+    assert (tmp_path / "group.csv.journal").exists()
+
+
+def test_render_page_formats_only_visible_rows():
+    students = [Student(i, f"S{i}", [i % 101]) for i in range(1, 121)]
+
+    page = render_page(students, 1, page_size=50)
+
+    assert "S51 " in page and "S100 " in page
+    assert "S50 " not in page and "S101 " not in page
+    assert "Страница 2/3 (строки 51-100), всего: 120" in page
+
+
+def test_print_table_pagination(monkeypatch, capsys):
+    students = [Student(i, f"S{i}", [50]) for i in range(1, 121)]
+    commands = iter(["", "p", "3", "#75", "q"])
+    monkeypatch.setattr('builtins.input', lambda msg="": next(commands))
+
+    print_table(students, page_size=50)
+
+    out = capsys.readouterr().out
+    pages = [line for line in out.splitlines() if line.startswith("Страница")]
+    # Старт, далее, назад, страница 3, переход к ID 75 (страница 2)
+    assert [p.split()[1] for p in pages] == ["1/3", "2/3", "1/3", "3/3", "2/3"]
@@ -1,5 +1,5 @@
 import pytest
-from lab.models import Student
+from lab.models import Student, StudentTable
 from lab.errors import ValidationError
 
 
@@ -38,4 +38,90 @@ def test_validation_grades():
 def test_grades_setter_validation():
     s = Student(1, "Ok")
     with pytest.raises(ValidationError):
-        s.grades = [200]  # Попытка присвоить плохие оценки
\ No newline at end of file
+        s.grades = [200]  # Попытка присвоить плохие оценки
+
+def test_student_table_roundtrip(sample_students):
+    table = StudentTable.from_students(sample_students)
+
+    assert len(table) == 4
+    assert list(table.ids) == [1, 2, 3, 4]
+    assert table.grades_of(0) == [80, 90]
+    assert table.grades_of(3) == []
+
+    restored = table.to_students()
+    assert [s.name for s in restored] == [s.name for s in sample_students]
+    assert [s.grades for s in restored] == [s.grades for s in sample_students]
+
+
+def test_student_table_averages(sample_students):
+    table = StudentTable.from_students(sample_students)
+    assert list(table.averages()) == [85.0, 60.0, 100.0, 0.0]
+    assert table[-1].name == "Dave"
+
+
+def test_student_table_inconsistent_columns():
+    with pytest.raises(ValidationError):
+        StudentTable([1, 2], ["A"], [], [0])
+
+
+def test_add_and_remove_grade_keep_average():
+    s = Student(1, "Ivan", [50])
+    s.add_grade(100)
+    assert s.grades == [50, 100]
+    assert s.average_grade == 75.0
+
+    s.remove_grade(50)
+    assert s.average_grade == 100.0
+
+    with pytest.raises(ValidationError):
+        s.remove_grade(42)
+    with pytest.raises(ValidationError):
+        s.add_grade(101)
+    assert s.grades == [100]
+
+
+def test_grades_copy_does_not_break_average():
+    s = Student(1, "Ivan", [10, 20])
+    s.grades.append(90)  # Изменение копии не влияет на студента
+    assert s.grades == [10, 20]
+    assert s.average_grade == 15.0
+
+
+def test_from_trusted_skips_validation():
+    s = Student.from_trusted(5, "Trusted", [90, 100])
+    assert s.id == 5
+    assert s.average_grade == 95.0
+
+    s.add_grade(80)
+    assert s.grades == [90, 100, 80]
+
+
+@pytest.mark.parametrize("policy", ["strict", "fast"])
+def test_from_values_policies_reject_bad_data(policy):
+    assert Student.from_values(1, "Ivan", [0, 100], policy).grades == [0, 100]
+
+    with pytest.raises(ValidationError, match="0-100"):
+        Student.from_values(1, "Ivan", [50, 101], policy)
+    with pytest.raises(ValidationError, match="ID"):
+        Student.from_values(0, "Ivan", [], policy)
+    with pytest.raises(ValidationError, match="Имя"):
+        Student.from_values(1, "", [], policy)
+
+
+def test_from_values_none_policy():
+    # Без проверки: ответственность за данные на вызывающем коде
+    assert Student.from_values(1, "Ivan", [150], "none").grades == [150]
+
+
+def test_student_is_slotted():
+    s = Student(1, "Ivan", [10, 20])
+    assert not hasattr(s, "__dict__")
+    with pytest.raises(AttributeError):
+        s.nickname = "Vanya"
+    assert isinstance(s.grades, list)
+
+
+def test_trusted_grades_out_of_byte_range():
+    # Оценки хранятся как uint8, значения вне 0-255 не помещаются
+    with pytest.raises(ValidationError, match="0-100"):
+        Student.from_trusted(1, "Ivan", [300])
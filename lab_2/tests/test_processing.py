@@ -1,4 +1,11 @@
-from lab.processing import calculate_group_stats, sort_students, get_top_n_students
+from lab.processing import (
+    calculate_group_stats,
+    sort_students,
+    get_top_n_students,
+    select_top_n,
+    GroupStatsAccumulator,
+)
+from lab.models import Student, StudentTable
 
 
 def test_calculate_stats(sample_students):
@@ -31,4 +38,101 @@ def test_get_top_n(sample_students):
     top = get_top_n_students(sample_students, 2)
     assert len(top) == 2
     assert top[0].name == "Charlie"
-    assert top[1].name == "Alice"
\ No newline at end of file
+    assert top[1].name == "Alice"
+
+def test_table_matches_list_processing(sample_students):
+    table = StudentTable.from_students(sample_students)
+
+    stats = calculate_group_stats(table)
+    assert stats.count == 4
+    assert stats.overall_average == 75.0
+    assert stats.best_student.name == "Charlie"
+    assert stats.worst_student.name == "Dave"
+
+    for strategy in ('id', 'name', 'avg'):
+        expected = [s.id for s in sort_students(sample_students, strategy)]
+        assert list(sort_students(table, strategy).ids) == expected
+
+    top = get_top_n_students(table, 2)
+    assert isinstance(top, StudentTable)
+    assert list(top.names) == ["Charlie", "Alice"]
+
+
+def test_select_top_n_matches_full_sort():
+    students = [Student(i, f"S{i % 7}", [i * 37 % 101, i * 13 % 101]) for i in range(1, 200)]
+    # Одинаковые средние и имена проверяют совпадение разрешения равенств
+    students += [Student(300 + i, "Same", [50]) for i in range(5)]
+
+    expected = sort_students(students, 'avg')[:25]
+    assert select_top_n(students, 25) == expected
+    assert select_top_n(iter(students), 25) == expected
+    assert select_top_n(students, 0) == []
+    assert len(select_top_n(students, 10_000)) == len(students)
+
+
+def test_stats_accumulator_merge(sample_students):
+    left = GroupStatsAccumulator().update(sample_students[:2])
+    right = GroupStatsAccumulator().update(iter(sample_students[2:]))
+
+    merged = left.merge(right).result()
+    assert merged == calculate_group_stats(sample_students)
+    assert merged.overall_average == 75.0
+    assert merged.best_student.name == "Charlie"
+    assert merged.worst_student.name == "Dave"
+
+
+def test_stats_empty_and_ties():
+    assert calculate_group_stats(iter([])).count == 0
+    assert GroupStatsAccumulator().merge(GroupStatsAccumulator()).result().best_student is None
+
+    a, b = Student(1, "A", [70]), Student(2, "B", [70])
+    stats = GroupStatsAccumulator().update([a]).merge(GroupStatsAccumulator().update([b])).result()
+    # При равенстве побеждает первый, как у max/min
+    assert stats.best_student is a
+    assert stats.worst_student is a
+
+
+def test_sort_collate_cyrillic():
+    students = [
+        Student(1, "Ёлкина Анна"),
+        Student(2, "Яковлев Петр"),
+        Student(3, "елкин Иван"),
+        Student(4, "Ежов Олег"),
+        Student(5, "Елкин Иван"),
+        Student(6, "Абрамов Лев"),
+    ]
+
+    # Обычная сортировка по строкам ставит Ё в начало, а строчные — в конец
+    assert [s.id for s in sort_students(students, 'name')] == [1, 6, 4, 5, 2, 3]
+
+    ordered = [s.id for s in sort_students(students, 'collate')]
+    assert ordered == [6, 4, 5, 3, 1, 2]
+    assert [s.id for s in sort_students(StudentTable.from_students(students), 'collate')] == ordered
+
+
+def test_collate_key_is_cached():
+    s = Student(1, "Иванов Иван")
+    assert s.name_key is s.name_key
+    assert s.name_key[0] == "иванов\0иван"
+
+
+def test_table_views_match_list_with_ties():
+    students = [Student(i, f"S{i % 7}", [i * 37 % 101, i * 13 % 101][:i % 3]) for i in range(1, 300)]
+    students += [Student(400 + i, "Same", [50]) for i in range(5)]
+    # Таблица из колонок (как из снимка): суммы и средние считаются заново
+    built = StudentTable.from_students(students)
+    table = StudentTable(built.ids, built.names, built.grades, built.offsets)
+
+    by_avg = sort_students(students, 'avg')
+    view = sort_students(table, 'avg')
+    assert [s.id for s in view] == [s.id for s in by_avg]
+    assert [s.id for s in get_top_n_students(table, 30)] == [s.id for s in by_avg[:30]]
+
+    # Представление над представлением и его материализация
+    by_name = sort_students(view, 'name')
+    assert list(by_name.ids) == [s.id for s in sort_students(by_avg, 'name')]
+    assert [by_name.grades_of(i) for i in range(3)] == [s.grades for s in sort_students(by_avg, 'name')[:3]]
+
+    stats, expected = calculate_group_stats(view), calculate_group_stats(by_avg)
+    assert (stats.overall_average, stats.best_student.id, stats.worst_student.id) == \
+        (expected.overall_average, expected.best_student.id, expected.worst_student.id)
@@ -0,0 +1,92 @@
+import pytest
+from lab.models import Student
+from lab.repository import StudentRepository
+from lab.errors import DuplicateStudentError, StudentNotFoundError, ValidationError
+
+
+def test_repository_get_add_remove(sample_students):
+    repo = StudentRepository(sample_students)
+
+    assert len(repo) == 4
+    assert 3 in repo
+    assert repo.get(3).name == "Charlie"
+
+    removed = repo.remove(2)
+    assert removed.name == "Bob"
+    assert 2 not in repo
+    assert [s.id for s in repo] == [1, 3, 4]
+
+    repo.add(Student(2, "Bob", [70]))
+    # Порядок обхода — порядок добавления
+    assert [s.id for s in repo] == [1, 3, 4, 2]
+
+
+def test_repository_errors(sample_students):
+    repo = StudentRepository(sample_students)
+
+    with pytest.raises(DuplicateStudentError):
+        repo.add(Student(1, "Clone"))
+    with pytest.raises(StudentNotFoundError, match="ID 42"):
+        repo.get(42)
+    with pytest.raises(StudentNotFoundError):
+        repo.remove(42)
+    with pytest.raises(StudentNotFoundError):
+        repo.update_grades(42, [50])
+
+
+def test_repository_update_grades(sample_students):
+    repo = StudentRepository(sample_students)
+
+    repo.update_grades(4, [90, 100])
+    assert repo.get(4).average_grade == 95.0
+
+    with pytest.raises(ValidationError):
+        repo.update_grades(4, [500])
+    assert repo.get(4).grades == [90, 100]
+
+
+def test_sorted_views_follow_changes():
+    import random
+    from lab.processing import sort_students
+
+    rng = random.Random(7)
+    repo = StudentRepository(
+        Student(i, rng.choice(["Anna", "Boris", "Vera"]), [rng.randint(0, 100)]) for i in range(1, 60)
+    )
+    for strategy in ('id', 'name', 'avg'):
+        repo.sorted_view(strategy)  # Строим представления до изменений
+
+    next_id = 100
+    for _ in range(200):
+        action = rng.choice(["add", "remove", "update"])
+        if action == "add":
+            repo.add(Student(next_id, rng.choice(["Anna", "Boris", "Gleb"]), [rng.randint(0, 100)]))
+            next_id += 1
+        elif action == "remove" and len(repo):
+            repo.remove(rng.choice([s.id for s in repo]))
+        elif len(repo):
+            repo.update_grades(rng.choice([s.id for s in repo]), [rng.randint(0, 100), 50])
+
+    for strategy in ('id', 'name', 'avg'):
+        assert repo.sorted_view(strategy) == sort_students(repo.to_list(), strategy)
+
+
+def test_sorted_view_is_cached_and_top_n(sample_students):
+    repo = StudentRepository(sample_students)
+
+    assert [s.name for s in repo.top_n(2)] == ["Charlie", "Alice"]  # Без индекса — куча
+    view = repo.sorted_view('avg')
+    assert repo.sorted_view('avg') is view
+    assert [s.name for s in repo.top_n(2)] == ["Charlie", "Alice"]
+
+    repo.update_grades(4, [100, 100])
+    assert [s.name for s in repo.top_n(2)] == ["Charlie", "Dave"]
+    assert repo.sorted_view('unknown') == repo.to_list()
+
+
+def test_collate_view():
+    repo = StudentRepository([Student(1, "Ёлкин Ян"), Student(2, "Елкин Ян"), Student(3, "Жуков Ян")])
+    assert [s.id for s in repo.sorted_view('collate')] == [2, 1, 3]
+
+    repo.add(Student(4, "Ежов Ян"))
+    assert [s.id for s in repo.sorted_view('collate')] == [4, 2, 1, 3]
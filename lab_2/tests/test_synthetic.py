@@ -0,0 +1,29 @@
+import sys
+from benchmarks.run import run_case
+from benchmarks.synthetic import iter_roster, write_roster_csv
+from lab.io_utils import load_students_from_csv
+
+
+def test_roster_is_deterministic(tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    write_roster_csv(str(first), 500, seed=7)
+    write_roster_csv(str(second), 500, seed=7)
+    assert first.read_bytes() == second.read_bytes()
+    assert list(iter_roster(50, seed=7)) == list(iter_roster(50, seed=7))
+    assert list(iter_roster(50, seed=7)) != list(iter_roster(50, seed=8))
+
+
+def test_roster_loads_back(tmp_path):
+    path = tmp_path / "roster.csv"
+    write_roster_csv(str(path), 300, seed=3)
+    students = load_students_from_csv(str(path))
+    assert [(s.id, s.name, s.grades) for s in students] == list(iter_roster(300, seed=3))
+
+
+def test_snapshot_benchmarks_run(tmp_path, monkeypatch):
+    # run_case подменяет sys.stdout: возвращаем его после теста
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    path = tmp_path / "roster.csv"
+    write_roster_csv(str(path), 200, seed=3)
+    for operation in ("load_snapshot_lazy", "load_snapshot_menu"):
+        assert run_case(operation, str(path), repeat=1, trace_alloc=False)["seconds"] >= 0
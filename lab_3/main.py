@@ -1,180 +1,57 @@
-import pandas as pd
-from sklearn.preprocessing import LabelEncoder
-import matplotlib.pyplot as plt
-import seaborn as sns
-import sqlite3
+"""
+Анализ набора данных UCI German Credit.
+
+Работа разбита на этапы: load → profile → encode → plot → persist → query.
+Импорт модуля ничего не выполняет; тяжелые библиотеки (pandas, sklearn,
+matplotlib, seaborn) импортируются внутри этапов, которым они нужны.
+Результаты этапов кэшируются на диске и пересчитываются, только если
+устарели относительно данных (или при --force).
+
+Примеры:
+    python main.py                    # все этапы
+    python main.py query              # только SQL-отчеты по готовой БД
+    python main.py plot --force       # перерисовать графики
+    python main.py load --download    # скачать набор с UCI, если локальных данных нет
+"""
+import argparse
 import os
+import pickle
+import sqlite3
+import sys
 
-# Загрузка данных
-url = "https://archive.ics.uci.edu/ml/machine-learning-databases/statlog/german/german.data"
+from dataset import CACHE_PATH, DB_PATH, DatasetUnavailableError, load_dataset
 
-# Стандартные имена столбцов согласно документации UCI German Credit Data
-column_names = [
-    "checking_account", "duration", "credit_history", "purpose", "credit_amount",
-    "savings_account", "employment", "installment_rate", "personal_status", "debtors",
-    "residence_since", "property", "age", "other_installments", "housing",
-    "existing_credits", "job", "liable_people", "telephone", "foreign_worker", "risk"
-]
+STAGES = ["load", "profile", "encode", "plot", "persist", "query"]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+ENCODED_CACHE = os.path.join(CACHE_DIR, "encoded.pkl")
+CHARTS_DIR = os.path.join(BASE_DIR, "charts")
+CHART_FILES = ["plot_1_heatmap.png", "plot_2_histograms.png", "plot_3_boxplot.png"]
 
-try:
-    # Загружаем данные
-    df = pd.read_csv(url, sep=' ', header=None, names=column_names)
-    print("✅ Данные успешно загружены!")
-except Exception as e:
-    print(f"❌ Ошибка при загрузке данных: {e}")
-
-# Обработка пропущенных значений
-missing_values = df.isnull().sum()
-print("\n--- Проверка пропущенных значений ---")
-if missing_values.sum() == 0:
-    print("Пропущенных значений (NaN) не обнаружено.")
-else:
-    print("Найдены пропущенные значения:")
-    print(missing_values[missing_values > 0])
-
-# Обзор данных
-print("\n--- Информация о датасете ---")
-print(df.info())
-
-print("\n--- Первые 5 строк данных ---")
-pd.set_option('display.max_columns', None)
-print(df.head())
-
-df['risk'] = df['risk'].map({1: 1, 2: 0})
-print("\nПримечание: Целевая переменная 'risk' преобразована: 1 = Good (кредит вернут), 0 = Bad (проблемы).")
-
-# Анализ числовых признаков
-print("\n=== Статистика по числовым признакам ===")
 numeric_cols = ['duration', 'credit_amount', 'installment_rate', 'residence_since', 'age', 'existing_credits', 'liable_people']
-print(df[numeric_cols].describe().round(2))
-
-# Анализ категориальных признаков
-print("\n=== Распределение ключевых категорий ===")
-for col in ['purpose', 'credit_history', 'housing']:
-    print(f"\n--- {col} (Топ-5 значений) ---")
-    print(df[col].value_counts().head(5))
-
-# Кодирование категориальных признаков
-df_encoded = df.copy()
-categorical_columns = df.select_dtypes(include=['object']).columns
-label_encoders = {}
-
-print("\n=== Кодирование категорий (Label Encoding) ===")
-for col in categorical_columns:
-    le = LabelEncoder()
-    df_encoded[col] = le.fit_transform(df[col])
-    label_encoders[col] = le
-    print(f"Столбец '{col}' закодирован. Пример: {le.classes_[:3]} -> [0, 1, 2]")
-
-print("\n--- Проверка результата кодирования (первые 3 строки) ---")
-print(df_encoded.head(3))
-
-
-# Визуализация
-# Настройка стиля
-sns.set(style="whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-
-print("\n=== Генерация и сохранение графиков ===")
-
-# Создание папки charts
-output_folder = "charts"
-if not os.path.exists(output_folder):
-    os.makedirs(output_folder)
-    print(f"📁 Папка '{output_folder}' создана.")
-else:
-    print(f"📁 Папка '{output_folder}' уже существует.")
-
-# Тепловая карта
-plt.figure(figsize=(12, 8))
-corr_matrix = df_encoded.corr()
-sns.heatmap(corr_matrix, annot=False, cmap='coolwarm', linewidths=0.5)
-plt.title('Матрица корреляции')
-plt.tight_layout()
-
-# Сохраняем в папку charts
-save_path_1 = os.path.join(output_folder, 'plot_1_heatmap.png')
-plt.savefig(save_path_1)
-print(f" График сохранен: {save_path_1}")
-plt.close()
-
-# Гистограммы
-fig, axes = plt.subplots(1, 2, figsize=(16, 6))
-sns.histplot(df['age'], bins=20, kde=True, ax=axes[0], color='skyblue')
-axes[0].set_title('Распределение возраста')
-sns.histplot(df['credit_amount'], bins=20, kde=True, ax=axes[1], color='salmon')
-axes[1].set_title('Распределение суммы кредита')
-plt.tight_layout()
-
-# Сохраняем в папку charts
-save_path_2 = os.path.join(output_folder, 'plot_2_histograms.png')
-plt.savefig(save_path_2)
-print(f"✅ График сохранен: {save_path_2}")
-plt.close()
-
-# Boxplot
-plt.figure(figsize=(14, 7))
-sns.boxplot(x='purpose', y='credit_amount', data=df, hue='purpose', palette='Set3', legend=False)
-plt.title('Разброс суммы кредита по целям')
-plt.xticks(rotation=45)
-plt.tight_layout()
-
-# Сохраняем в папку charts
-save_path_3 = os.path.join(output_folder, 'plot_3_boxplot.png')
-plt.savefig(save_path_3)
-print(f"✅ График сохранен: {save_path_3}")
-plt.close()
-
-print(f"Визуализация завершена. Проверьте папку '{output_folder}' в проекте.")
-
-# Работа с БД
-db_name = "german_credit.db"
-conn = sqlite3.connect(db_name)
-cursor = conn.cursor()
-
-print(f" База данных '{db_name}' создана и подключение установлено.")
-
-try:
-    df.to_sql('credits', conn, if_exists='replace', index=False)
-    print(" Данные успешно загружены в таблицу 'credits'.")
-except Exception as e:
-    print(f" Ошибка при записи в БД: {e}")
-
-
-def run_query(query, title):
-    print(f"\n--- {title} ---")
-    print(f"SQL: {query}")
-    result = pd.read_sql(query, conn)
-    print(result)
-    return result
-
-
-# Запрос 1
-query_1 = """
+
+# SQL-отчеты: (заголовок, запрос)
+queries = [
+    ("Топ-5 крупных 'плохих' кредитов (>24 мес)", """
 SELECT purpose, duration, credit_amount, age
 FROM credits
 WHERE risk = 0 AND duration > 24
 ORDER BY credit_amount DESC
 LIMIT 5;
-"""
-run_query(query_1, "Топ-5 крупных 'плохих' кредитов (>24 мес)")
-
-# Запрос 2
-query_2 = """
-SELECT 
-    purpose, 
+"""),
+    ("Статистика по целям кредита (Средняя сумма и Макс. возраст)", """
+SELECT
+    purpose,
     COUNT(*) as count_loans,
     ROUND(AVG(credit_amount), 2) as avg_amount,
     MAX(age) as max_age
 FROM credits
 GROUP BY purpose
 ORDER BY avg_amount DESC;
-"""
-run_query(query_2, "Статистика по целям кредита (Средняя сумма и Макс. возраст)")
-
-# Запрос 3
-query_3 = """
-SELECT 
+"""),
+    ("Процент возврата кредитов в зависимости от типа жилья", """
+SELECT
     housing,
     COUNT(*) as total_clients,
     SUM(CASE WHEN risk = 0 THEN 1 ELSE 0 END) as bad_loans,
@@ -182,8 +59,267 @@ SELECT
 FROM credits
 GROUP BY housing
 ORDER BY good_loans_percent DESC;
-"""
-run_query(query_3, "Процент возврата кредитов в зависимости от типа жилья")
+"""),
+]
+
 
-conn.close()
-print("\n Работа с базой данных завершена, соединение закрыто.")
\ No newline at end of file
+def is_fresh(path, *sources):
+    """Файл существует и не старше ни одного из существующих источников."""
+    if not os.path.exists(path):
+        return False
+    mtime = os.path.getmtime(path)
+    return all(mtime >= os.path.getmtime(src) for src in sources if os.path.exists(src))
+
+
+def has_credits_table(db_path=DB_PATH):
+    if not os.path.exists(db_path):
+        return False
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'credits'"
+        ).fetchone()
+    return row is not None
+
+
+class Pipeline:
+    """
+    Этапы анализа. Данные, нужные этапу, вычисляются (или берутся
+    из кэша) при первом обращении, поэтому любой этап можно запустить
+    отдельно — зависимости подтянутся сами.
+    """
+
+    def __init__(self, download=False, refresh=False, force=False):
+        self.download = download
+        self.refresh = refresh
+        self.force = force
+        self._raw = None
+        self._df = None
+        self._encoded = None
+
+    # Данные
+
+    @property
+    def raw(self):
+        """Набор данных в исходной кодировке (risk: 1 = Good, 2 = Bad)."""
+        if self._raw is None:
+            self._raw = load_dataset(download_missing=self.download, refresh=self.refresh)
+            # Кэш набора уже пересобран, повторно делать это не нужно
+            self.refresh = False
+        return self._raw
+
+    @property
+    def df(self):
+        """Набор данных с целевой переменной risk: 1 = Good, 0 = Bad."""
+        if self._df is None:
+            self._df = self.raw.copy()
+            self._df['risk'] = self._df['risk'].map({1: 1, 2: 0})
+        return self._df
+
+    @property
+    def encoded(self):
+        """(df_encoded, {столбец: классы}) — результат этапа encode."""
+        if self._encoded is None:
+            self.stage_encode()
+        return self._encoded
+
+    # Этапы
+
+    def stage_load(self):
+        df = self.raw
+        print(f"✅ Данные успешно загружены! ({len(df)} строк)")
+
+    def stage_profile(self):
+        import pandas as pd
+
+        df = self.raw
+
+        # Обработка пропущенных значений
+        missing_values = df.isnull().sum()
+        print("\n--- Проверка пропущенных значений ---")
+        if missing_values.sum() == 0:
+            print("Пропущенных значений (NaN) не обнаружено.")
+        else:
+            print("Найдены пропущенные значения:")
+            print(missing_values[missing_values > 0])
+
+        # Обзор данных
+        print("\n--- Информация о датасете ---")
+        df.info()
+
+        print("\n--- Первые 5 строк данных ---")
+        pd.set_option('display.max_columns', None)
+        print(df.head())
+
+        print("\nПримечание: Целевая переменная 'risk' преобразована: 1 = Good (кредит вернут), 0 = Bad (проблемы).")
+        df = self.df
+
+        # Анализ числовых признаков
+        print("\n=== Статистика по числовым признакам ===")
+        print(df[numeric_cols].describe().round(2))
+
+        # Анализ категориальных признаков
+        print("\n=== Распределение ключевых категорий ===")
+        for col in ['purpose', 'credit_history', 'housing']:
+            print(f"\n--- {col} (Топ-5 значений) ---")
+            print(df[col].value_counts().head(5))
+
+    def stage_encode(self):
+        print("\n=== Кодирование категорий (Label Encoding) ===")
+
+        if not self.force and is_fresh(ENCODED_CACHE, CACHE_PATH):
+            with open(ENCODED_CACHE, "rb") as f:
+                self._encoded = pickle.load(f)
+            print(f"Закодированные данные взяты из кэша: {ENCODED_CACHE}")
+        else:
+            from sklearn.preprocessing import LabelEncoder
+
+            df = self.df
+            df_encoded = df.copy()
+            categorical_columns = df.select_dtypes(include=['object', 'category']).columns
+            classes = {}
+
+            for col in categorical_columns:
+                le = LabelEncoder()
+                df_encoded[col] = le.fit_transform(df[col])
+                classes[col] = le.classes_
+                print(f"Столбец '{col}' закодирован. Пример: {le.classes_[:3]} -> [0, 1, 2]")
+
+            self._encoded = (df_encoded, classes)
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(ENCODED_CACHE, "wb") as f:
+                pickle.dump(self._encoded, f)
+
+        print("\n--- Проверка результата кодирования (первые 3 строки) ---")
+        print(self._encoded[0].head(3))
+
+    def stage_plot(self):
+        print("\n=== Генерация и сохранение графиков ===")
+
+        paths = [os.path.join(CHARTS_DIR, name) for name in CHART_FILES]
+        if not self.force and all(is_fresh(path, CACHE_PATH) for path in paths):
+            print(f"Графики актуальны, перерисовка не нужна (папка '{CHARTS_DIR}', --force — перерисовать).")
+            return
+
+        import matplotlib
+        matplotlib.use("Agg")  # Графики только сохраняются в файлы
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # Настройка стиля
+        sns.set(style="whitegrid")
+        plt.rcParams['figure.figsize'] = (12, 6)
+
+        # Создание папки charts
+        if not os.path.exists(CHARTS_DIR):
+            os.makedirs(CHARTS_DIR)
+            print(f"📁 Папка '{CHARTS_DIR}' создана.")
+        else:
+            print(f"📁 Папка '{CHARTS_DIR}' уже существует.")
+
+        df = self.df
+        df_encoded = self.encoded[0]
+
+        # Тепловая карта
+        plt.figure(figsize=(12, 8))
+        corr_matrix = df_encoded.corr()
+        sns.heatmap(corr_matrix, annot=False, cmap='coolwarm', linewidths=0.5)
+        plt.title('Матрица корреляции')
+        plt.tight_layout()
+        plt.savefig(paths[0])
+        print(f"✅ График сохранен: {paths[0]}")
+        plt.close()
+
+        # Гистограммы
+        fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+        sns.histplot(df['age'], bins=20, kde=True, ax=axes[0], color='skyblue')
+        axes[0].set_title('Распределение возраста')
+        sns.histplot(df['credit_amount'], bins=20, kde=True, ax=axes[1], color='salmon')
+        axes[1].set_title('Распределение суммы кредита')
+        plt.tight_layout()
+        plt.savefig(paths[1])
+        print(f"✅ График сохранен: {paths[1]}")
+        plt.close()
+
+        # Boxplot
+        plt.figure(figsize=(14, 7))
+        sns.boxplot(x='purpose', y='credit_amount', data=df, hue='purpose', palette='Set3', legend=False)
+        plt.title('Разброс суммы кредита по целям')
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+        plt.savefig(paths[2])
+        print(f"✅ График сохранен: {paths[2]}")
+        plt.close()
+
+        print(f"Визуализация завершена. Проверьте папку '{CHARTS_DIR}' в проекте.")
+
+    def stage_persist(self):
+        print("\n=== Запись в базу данных ===")
+
+        if not self.force and has_credits_table() and is_fresh(DB_PATH, CACHE_PATH):
+            print(f"Таблица 'credits' в '{DB_PATH}' актуальна, перезапись не нужна.")
+            return
+
+        df = self.df
+        with sqlite3.connect(DB_PATH) as conn:
+            df.to_sql('credits', conn, if_exists='replace', index=False)
+        print(f" Данные успешно загружены в таблицу 'credits' ({DB_PATH}).")
+
+    def stage_query(self):
+        # Отчетам нужна только БД: набор данных загружается, лишь если таблицы нет
+        if not has_credits_table():
+            self.stage_persist()
+
+        import pandas as pd
+
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            for title, query in queries:
+                print(f"\n--- {title} ---")
+                print(f"SQL: {query}")
+                print(pd.read_sql(query, conn))
+        finally:
+            conn.close()
+        print("\n Работа с базой данных завершена, соединение закрыто.")
+
+    def run(self, stages):
+        if self.refresh:
+            # Кэш набора пересобирается до проверки актуальности остальных кэшей
+            self.raw
+        # Этапы выполняются в порядке конвейера независимо от порядка в командной строке
+        for stage in STAGES:
+            if stage in stages:
+                getattr(self, f"stage_{stage}")()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Анализ набора данных German Credit по этапам.")
+    # choices не используется: с nargs="*" argparse проверяет по ним и значение по умолчанию
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help=f"этапы для запуска: {' '.join(STAGES)} (по умолчанию все)")
+    parser.add_argument("--download", action="store_true",
+                        help="скачать набор с UCI, если локальных данных нет")
+    parser.add_argument("--refresh", action="store_true",
+                        help="пересобрать кэш набора данных из исходного файла или БД")
+    parser.add_argument("--force", action="store_true",
+                        help="пересчитать результаты этапов, даже если кэш актуален")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [stage for stage in args.stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"неизвестные этапы: {' '.join(unknown)} (доступны: {' '.join(STAGES)})")
+
+    pipeline = Pipeline(download=args.download, refresh=args.refresh, force=args.force)
+    try:
+        pipeline.run(args.stages or STAGES)
+    except (DatasetUnavailableError, OSError, sqlite3.Error) as e:
+        print(f"❌ Ошибка: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())